@@ -0,0 +1,48 @@
+"""composite indexes for user scoped list queries
+
+Revision ID: 20261015_0005
+Revises: 20260511_0004
+Create Date: 2026-10-15 10:00:00
+"""
+
+from alembic import op
+
+
+revision = "20261015_0005"
+down_revision = "20260511_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_health_conditions_user_id_condition_type",
+        "health_conditions",
+        ["user_id", "condition_type"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_health_conditions_user_id_condition_code",
+        "health_conditions",
+        ["user_id", "condition_code"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_chat_sessions_user_id_updated_at",
+        "chat_sessions",
+        ["user_id", "updated_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_chat_messages_session_id_created_at",
+        "chat_messages",
+        ["session_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_messages_session_id_created_at", table_name="chat_messages")
+    op.drop_index("ix_chat_sessions_user_id_updated_at", table_name="chat_sessions")
+    op.drop_index("ix_health_conditions_user_id_condition_code", table_name="health_conditions")
+    op.drop_index("ix_health_conditions_user_id_condition_type", table_name="health_conditions")
@@ -0,0 +1,36 @@
+"""meal date and unread message indexes
+
+Revision ID: 20261015_0006
+Revises: 20261015_0005
+Create Date: 2026-10-15 14:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261015_0006"
+down_revision = "20261015_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_meals_user_id_record_date",
+        "meals",
+        ["user_id", "record_date"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_app_messages_user_id_unread",
+        "app_messages",
+        ["user_id"],
+        unique=False,
+        postgresql_where=sa.text("is_read = false"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_app_messages_user_id_unread", table_name="app_messages")
+    op.drop_index("ix_meals_user_id_record_date", table_name="meals")
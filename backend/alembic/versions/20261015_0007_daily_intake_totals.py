@@ -0,0 +1,56 @@
+"""daily intake totals table
+
+Revision ID: 20261015_0007
+Revises: 20261015_0006
+Create Date: 2026-10-15 16:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261015_0007"
+down_revision = "20261015_0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_intake",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("record_date", sa.Date(), nullable=False),
+        sa.Column("calories", sa.Float(), nullable=False),
+        sa.Column("sodium", sa.Float(), nullable=False),
+        sa.Column("purine", sa.Float(), nullable=False),
+        sa.Column("protein", sa.Float(), nullable=False),
+        sa.Column("carbs", sa.Float(), nullable=False),
+        sa.Column("fat", sa.Float(), nullable=False),
+        sa.Column("meal_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "record_date"),
+    )
+    # 由现有饮食记录回填汇总
+    op.execute(
+        """
+        INSERT INTO daily_intake (
+            user_id, record_date, calories, sodium, purine, protein, carbs, fat, meal_count
+        )
+        SELECT
+            user_id,
+            record_date,
+            COALESCE(SUM(calories), 0),
+            COALESCE(SUM(sodium), 0),
+            COALESCE(SUM(purine), 0),
+            COALESCE(SUM(protein), 0),
+            COALESCE(SUM(carbs), 0),
+            COALESCE(SUM(fat), 0),
+            COUNT(*)
+        FROM meals
+        GROUP BY user_id, record_date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_intake")
@@ -0,0 +1,34 @@
+"""widen meal date index for keyset pagination
+
+Revision ID: 20261015_0008
+Revises: 20261015_0007
+Create Date: 2026-10-15 18:00:00
+"""
+
+from alembic import op
+
+
+revision = "20261015_0008"
+down_revision = "20261015_0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_meals_user_id_record_date_created_at_id",
+        "meals",
+        ["user_id", "record_date", "created_at", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_meals_user_id_record_date", table_name="meals")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_meals_user_id_record_date",
+        "meals",
+        ["user_id", "record_date"],
+        unique=False,
+    )
+    op.drop_index("ix_meals_user_id_record_date_created_at_id", table_name="meals")
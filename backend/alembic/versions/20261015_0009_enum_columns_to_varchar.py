@@ -0,0 +1,61 @@
+"""store meal, message and chat role enums as varchar
+
+Revision ID: 20261015_0009
+Revises: 20261015_0008
+Create Date: 2026-10-15 20:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20261015_0009"
+down_revision = "20261015_0008"
+branch_labels = None
+depends_on = None
+
+
+# (表, 列, PG 枚举类型, 枚举值)
+ENUM_COLUMNS = [
+    ("meals", "meal_type", "mealtype", ("BREAKFAST", "LUNCH", "DINNER", "SNACK")),
+    ("meals", "category", "foodcategory", ("STAPLE", "MEAT", "VEG", "DRINK", "SNACK")),
+    ("meals", "sync_status", "syncstatus", ("PENDING", "SYNCED", "CONFLICT")),
+    ("app_messages", "message_type", "messagetype", ("WARNING", "ADVICE", "BRIEF")),
+    ("chat_messages", "role", "messagerole", ("user", "assistant", "system")),
+]
+
+
+def upgrade() -> None:
+    # 带枚举类型默认值的列需先去掉默认值才能改类型
+    op.alter_column("meals", "sync_status", server_default=None)
+    for table, column, type_name, values in ENUM_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.String(16),
+            existing_type=postgresql.ENUM(*values, name=type_name, create_type=False),
+            existing_nullable=False,
+            postgresql_using=f"{column}::text",
+        )
+    op.alter_column("meals", "sync_status", server_default="SYNCED")
+
+    for _table, _column, type_name, values in ENUM_COLUMNS:
+        postgresql.ENUM(*values, name=type_name).drop(op.get_bind(), checkfirst=True)
+
+
+def downgrade() -> None:
+    for _table, _column, type_name, values in ENUM_COLUMNS:
+        postgresql.ENUM(*values, name=type_name).create(op.get_bind(), checkfirst=True)
+
+    op.alter_column("meals", "sync_status", server_default=None)
+    for table, column, type_name, values in ENUM_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=postgresql.ENUM(*values, name=type_name, create_type=False),
+            existing_type=sa.String(16),
+            existing_nullable=False,
+            postgresql_using=f"{column}::{type_name}",
+        )
+    op.alter_column("meals", "sync_status", server_default="SYNCED")
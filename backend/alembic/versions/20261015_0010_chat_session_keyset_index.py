@@ -0,0 +1,34 @@
+"""widen chat session index for keyset pagination
+
+Revision ID: 20261015_0010
+Revises: 20261015_0009
+Create Date: 2026-10-15 21:00:00
+"""
+
+from alembic import op
+
+
+revision = "20261015_0010"
+down_revision = "20261015_0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_chat_sessions_user_id_updated_at_id",
+        "chat_sessions",
+        ["user_id", "updated_at", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_chat_sessions_user_id_updated_at", table_name="chat_sessions")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_chat_sessions_user_id_updated_at",
+        "chat_sessions",
+        ["user_id", "updated_at"],
+        unique=False,
+    )
+    op.drop_index("ix_chat_sessions_user_id_updated_at_id", table_name="chat_sessions")
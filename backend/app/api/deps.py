@@ -2,33 +2,71 @@
 API 依赖注入
 """
 
-from typing import Annotated
+import base64
+import hashlib
+import time
+from typing import Annotated, TypeVar
 
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import orjson
+from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.orm import load_only, raiseload
+from sqlalchemy import Select, bindparam, select
 
-from app.core.database import get_db
+from app.core.cache import TTLCache
+from app.core.database import get_db, get_db_ro
 from app.core.security import decode_token
 from app.models.user import User
 
 
-# HTTP Bearer Token 认证方案
-security = HTTPBearer()
+# 按 id 查询用户，模块级构建一次，执行时只绑定参数
+# 只加载 UserResponse 与业务计算用到的列，不取 password_hash 等字段；
+# 缓存的用户对象已脱离会话，访问未加载的列会报错，新增读取字段时需同步补充
+_USER_BY_ID_QUERY = (
+    select(User)
+    .options(load_only(
+        User.id,
+        User.phone,
+        User.nickname,
+        User.avatar_url,
+        User.gender,
+        User.age,
+        User.height,
+        User.weight,
+        User.is_active,
+        User.is_verified,
+        User.created_at,
+    ))
+    .where(User.id == bindparam("user_id"))
+)
 
+# 按 (id, user_id) 查询归属记录的语句，按模型缓存
+_OWNED_QUERIES: dict[type, Select] = {}
 
-async def get_current_user(
-    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
-    db: Annotated[AsyncSession, Depends(get_db)]
-) -> User:
-    """
-    获取当前登录用户
-    
-    从 Authorization Header 中提取 JWT Token，验证后返回用户对象
-    """
-    token = credentials.credentials
-    
+ModelT = TypeVar("ModelT")
+
+# 认证缓存：Access Token 摘要 -> user_id
+# 只缓存校验通过的 Access Token，命中时跳过 JWT 解码与类型检查
+_AUTH_CACHE: TTLCache[bytes, int] = TTLCache(maxsize=4096, ttl=60.0)
+
+# 用户对象缓存：user_id -> 已脱离会话的 User
+_USER_CACHE: TTLCache[int, User] = TTLCache(maxsize=4096, ttl=30.0)
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _cache_user_id(key: bytes, user_id: int, exp: object) -> None:
+    """缓存 Token 对应的用户 id，有效期不超过 Token 自身的 exp"""
+    ttl = None
+    if isinstance(exp, (int, float)):
+        ttl = exp - time.time()
+    _AUTH_CACHE.set(key, user_id, ttl)
+
+
+def _decode_access_token(token: str) -> tuple[int, object]:
+    """解码并校验 Access Token，返回 (用户 id, exp)"""
     payload = decode_token(token)
     if payload is None:
         raise HTTPException(
@@ -52,9 +90,68 @@ async def get_current_user(
             detail="无效的Token",
             headers={"WWW-Authenticate": "Bearer"}
         )
+    return int(user_id), payload.get("exp")
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    """用户资料、密码或状态变更后调用，下次请求重新从数据库加载"""
+    _USER_CACHE.pop(user_id)
+
+
+def _bearer_token(request: Request) -> str:
+    """从 Authorization Header 中直接解析 Bearer Token"""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        scheme, _, token = authorization.partition(" ")
+        token = token.strip()
+        if scheme.lower() == "bearer" and token:
+            return token
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="未提供认证凭据",
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+async def get_current_user(
+    request: Request,
+    token: Annotated[str, Depends(_bearer_token)],
+    db: Annotated[AsyncSession, Depends(get_db)]
+) -> User:
+    """
+    获取当前登录用户
+    
+    从 Authorization Header 中提取 JWT Token，验证后返回用户对象。
+    返回的用户对象可能来自进程内缓存，已脱离数据库会话，只应读取；
+    需要修改用户时请在当前会话中重新加载。
+    成功结果由 FastAPI 在同一请求内缓存；认证失败时把异常记录在 request.state 上，
+    同一请求内再次解析时直接抛出，不再重复解码与查库。
+    """
+    auth_error = getattr(request.state, "auth_error", None)
+    if auth_error is not None:
+        raise auth_error
+    
+    try:
+        return await _authenticate(token, db)
+    except HTTPException as exc:
+        request.state.auth_error = exc
+        raise
+
+
+async def _authenticate(token: str, db: AsyncSession) -> User:
+    """校验 Token 并加载用户"""
+    key = _token_key(token)
+    user_id = _AUTH_CACHE.get(key)
+    if user_id is None:
+        user_id, exp = _decode_access_token(token)
+        _cache_user_id(key, user_id, exp)
+    
+    user = _USER_CACHE.get(user_id)
+    if user is not None:
+        return user
     
     # 查询用户
-    result = await db.execute(select(User).where(User.id == int(user_id)))
+    result = await db.execute(_USER_BY_ID_QUERY, {"user_id": user_id})
     user = result.scalar_one_or_none()
     
     if user is None:
@@ -70,9 +167,66 @@ async def get_current_user(
             detail="账户已被禁用"
         )
     
+    # 从会话中移出后再缓存，供后续请求复用
+    db.expunge(user)
+    _USER_CACHE.set(user.id, user)
+    
     return user
 
 
+def _owned_query(model: type) -> Select:
+    query = _OWNED_QUERIES.get(model)
+    if query is None:
+        query = select(model).where(
+            model.id == bindparam("obj_id"),
+            model.user_id == bindparam("user_id")
+        ).options(raiseload("*"))
+        _OWNED_QUERIES[model] = query
+    return query
+
+
+async def get_owned(
+    db: AsyncSession,
+    model: type[ModelT],
+    obj_id: int,
+    user_id: int,
+    detail: str = "记录不存在"
+) -> ModelT:
+    """
+    查询属于指定用户的记录
+    
+    记录不存在或不属于该用户时统一返回 404。
+    """
+    result = await db.execute(_owned_query(model), {"obj_id": obj_id, "user_id": user_id})
+    obj = result.scalar_one_or_none()
+    if obj is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail
+        )
+    return obj
+
+
+def encode_cursor(*key: object) -> str:
+    """把排序键编码为分页游标，日期时间按 ISO 格式序列化"""
+    return base64.urlsafe_b64encode(orjson.dumps(key)).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """解析分页游标，格式不符时返回 400"""
+    try:
+        key = orjson.loads(base64.urlsafe_b64decode(cursor))
+    except ValueError:
+        key = None
+    if not isinstance(key, list) or len(key) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的分页游标"
+        )
+    return key
+
+
 # 类型别名，简化依赖注入
 CurrentUser = Annotated[User, Depends(get_current_user)]
 DbSession = Annotated[AsyncSession, Depends(get_db)]
+DbSessionRO = Annotated[AsyncSession, Depends(get_db_ro)]
@@ -6,13 +6,15 @@ from datetime import datetime, timezone
 from typing import Annotated
 
 from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import DbSession, CurrentUser
+from app.api.deps import DbSession, CurrentUser, invalidate_cached_user
 from app.core.security import (
-    verify_password,
+    verify_and_update_password_async,
+    verify_password_async,
     get_password_hash,
+    get_password_hash_async,
     create_access_token,
     create_refresh_token,
     decode_token
@@ -35,10 +37,17 @@ from app.schemas.user import (
 )
 from app.services.verification_service import verification_service
 from app.services.target_service import calculate_daily_targets
-from app.models.health_condition import ConditionStatus
+from app.models.health_condition import ConditionStatus, HealthCondition
 
 router = APIRouter(prefix="/auth", tags=["认证"])
 
+# 常用查询在模块级构建一次，执行时只绑定参数
+_USER_BY_PHONE_QUERY = select(User).where(User.phone == bindparam("phone"))
+_USER_BY_ID_QUERY = select(User).where(User.id == bindparam("user_id"))
+
+# 手机号未注册时用于比对的占位哈希，保证登录失败路径耗时一致，避免枚举账号
+_DUMMY_PASSWORD_HASH = get_password_hash("dummy-password-not-for-login")
+
 
 @router.post("/register", response_model=LoginResponse, status_code=status.HTTP_201_CREATED)
 async def register(data: UserRegister, db: DbSession):
@@ -50,7 +59,7 @@ async def register(data: UserRegister, db: DbSession):
     - **nickname**: 可选昵称
     """
     # 检查手机号是否已注册
-    result = await db.execute(select(User).where(User.phone == data.phone))
+    result = await db.execute(_USER_BY_PHONE_QUERY, {"phone": data.phone})
     if result.scalar_one_or_none():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -60,12 +69,11 @@ async def register(data: UserRegister, db: DbSession):
     # 创建用户
     user = User(
         phone=data.phone,
-        password_hash=get_password_hash(data.password),
+        password_hash=await get_password_hash_async(data.password),
         nickname=data.nickname or f"用户{data.phone[-4:]}"
     )
     db.add(user)
     await db.flush()
-    await db.refresh(user)
     
     # 生成 Token
     access_token = create_access_token(user.id)
@@ -90,10 +98,15 @@ async def login(data: UserLogin, db: DbSession):
     - **password**: 密码
     """
     # 查询用户
-    result = await db.execute(select(User).where(User.phone == data.phone))
+    result = await db.execute(_USER_BY_PHONE_QUERY, {"phone": data.phone})
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(data.password, user.password_hash):
+    # 用户不存在时同样执行一次哈希校验
+    password_ok, new_hash = await verify_and_update_password_async(
+        data.password,
+        user.password_hash if user else _DUMMY_PASSWORD_HASH
+    )
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="手机号或密码错误"
@@ -105,8 +118,10 @@ async def login(data: UserLogin, db: DbSession):
             detail="账户已被禁用"
         )
     
-    # 更新最后登录时间
+    # 更新最后登录时间；哈希轮数与当前配置不一致时一并更新
     user.last_login_at = datetime.now(timezone.utc)
+    if new_hash:
+        user.password_hash = new_hash
     await db.flush()
     
     # 生成 Token
@@ -139,7 +154,7 @@ async def send_code(data: SendCodeRequest, db: DbSession):
         )
 
     if data.purpose == "reset_password":
-        result = await db.execute(select(User).where(User.phone == data.phone))
+        result = await db.execute(_USER_BY_PHONE_QUERY, {"phone": data.phone})
         if not result.scalar_one_or_none():
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -163,7 +178,7 @@ async def login_with_code(data: CodeLoginRequest, db: DbSession):
             detail="验证码无效或已过期"
         )
 
-    result = await db.execute(select(User).where(User.phone == data.phone))
+    result = await db.execute(_USER_BY_PHONE_QUERY, {"phone": data.phone})
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(
@@ -202,7 +217,7 @@ async def reset_password(data: ResetPasswordRequest, db: DbSession):
             detail="验证码无效或已过期"
         )
 
-    result = await db.execute(select(User).where(User.phone == data.phone))
+    result = await db.execute(_USER_BY_PHONE_QUERY, {"phone": data.phone})
     user = result.scalar_one_or_none()
     if not user:
         raise HTTPException(
@@ -210,8 +225,9 @@ async def reset_password(data: ResetPasswordRequest, db: DbSession):
             detail="该手机号未注册"
         )
 
-    user.password_hash = get_password_hash(data.new_password)
+    user.password_hash = await get_password_hash_async(data.new_password)
     await db.flush()
+    invalidate_cached_user(user.id)
     return {"success": True, "message": "密码重置成功"}
 
 
@@ -233,7 +249,7 @@ async def refresh_token(data: RefreshTokenRequest, db: DbSession):
     user_id = payload.get("sub")
     
     # 验证用户是否存在且有效
-    result = await db.execute(select(User).where(User.id == int(user_id)))
+    result = await db.execute(_USER_BY_ID_QUERY, {"user_id": int(user_id)})
     user = result.scalar_one_or_none()
     
     if not user or not user.is_active:
@@ -268,13 +284,15 @@ async def update_profile(
     """更新用户资料"""
     update_data = data.model_dump(exclude_unset=True)
     
+    # current_user 可能来自缓存，修改前在当前会话中重新加载
+    user = await db.get(User, current_user.id)
     for field, value in update_data.items():
-        setattr(current_user, field, value)
+        setattr(user, field, value)
     
     await db.flush()
-    await db.refresh(current_user)
+    invalidate_cached_user(user.id)
     
-    return UserResponse.model_validate(current_user)
+    return UserResponse.model_validate(user)
 
 
 @router.post("/change-password")
@@ -284,14 +302,16 @@ async def change_password(
     db: DbSession
 ):
     """修改密码"""
-    if not verify_password(data.old_password, current_user.password_hash):
+    user = await db.get(User, current_user.id)
+    if not await verify_password_async(data.old_password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="原密码错误"
         )
     
-    current_user.password_hash = get_password_hash(data.new_password)
+    user.password_hash = await get_password_hash_async(data.new_password)
     await db.flush()
+    invalidate_cached_user(user.id)
     
     return {"success": True, "message": "密码修改成功"}
 
@@ -303,15 +323,16 @@ async def get_daily_targets(current_user: CurrentUser, db: DbSession):
     
     基于用户身体参数动态计算
     """
-    from sqlalchemy import select
-    from app.models.health_condition import HealthCondition
-    
-    # 查询用户健康状况
+    # 查询用户健康状况，只取计算限值所需的列
     result = await db.execute(
-        select(HealthCondition).where(
+        select(
+            HealthCondition.condition_code,
+            HealthCondition.title,
+            HealthCondition.status
+        ).where(
             HealthCondition.user_id == current_user.id,
             HealthCondition.status.in_([ConditionStatus.ACTIVE, ConditionStatus.MONITORING, ConditionStatus.ALERT])
         )
     )
-    conditions = result.scalars().all()
+    conditions = result.all()
     return calculate_daily_targets(current_user, conditions)
@@ -6,16 +6,21 @@ from typing import Any, AsyncGenerator, List, Optional
 
 from fastapi import APIRouter, HTTPException, Response, status, UploadFile, File, Form
 from fastapi.responses import StreamingResponse
-from sqlalchemy import select
-import base64
-import json
+from pydantic import TypeAdapter
+from sqlalchemy import String, cast, delete, func, insert, literal, null, select, tuple_, union_all
+from sqlalchemy.orm import raiseload
+import asyncio
 import logging
 import time
+from datetime import datetime
 
-from app.api.deps import DbSession, CurrentUser
+import orjson
+
+from app.api.deps import DbSession, CurrentUser, decode_cursor, encode_cursor, get_owned
 from app.core.config import settings
+from app.core.orjson_response import model_json_response
 from app.models.chat import ChatSession, ChatMessage, MessageRole
-from app.models.health_condition import HealthCondition
+from app.models.health_condition import ConditionStatus, ConditionType, HealthCondition
 from app.models.meal import MealType, FoodCategory
 from app.schemas.chat import (
     ChatMessageCreate,
@@ -42,11 +47,19 @@ knowledge_service = KnowledgeService()
 intake_service = IntakeService()
 logger = logging.getLogger(__name__)
 
+# 上传图片按块读取的大小
+_UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# 会话详情中的消息列表一次性批量校验
+_MESSAGE_LIST_ADAPTER = TypeAdapter(List[ChatMessageResponse])
+
 
 async def get_user_conditions(user_id: int, db) -> List[HealthCondition]:
     """获取用户健康状况"""
     result = await db.execute(
-        select(HealthCondition).where(HealthCondition.user_id == user_id)
+        select(HealthCondition)
+        .where(HealthCondition.user_id == user_id)
+        .options(raiseload("*"))
     )
     return list(result.scalars().all())
 
@@ -65,16 +78,107 @@ def _truncate_text(value: str, max_chars: int) -> str:
     return value[-max_chars:]
 
 
-async def _load_recent_history(db, session_id: int) -> list[ChatMessage]:
-    result = await db.execute(
-        select(ChatMessage)
+async def _insert_user_message(db, session_id: int, user_id: int, data: ChatMessageCreate) -> Optional[int]:
+    """
+    校验会话归属并写入用户消息，一次往返完成
+
+    使用 INSERT ... SELECT ... WHERE EXISTS，会话不存在或不属于当前用户时不插入任何行，返回 None。
+    """
+    columns = ChatMessage.__table__.c
+    owned_session = (
+        select(ChatSession.id)
+        .where(ChatSession.id == session_id, ChatSession.user_id == user_id)
+        .exists()
+    )
+    stmt = (
+        insert(ChatMessage)
+        .from_select(
+            ["session_id", "role", "content", "attachments"],
+            select(
+                literal(session_id, columns.session_id.type),
+                literal(MessageRole.USER, columns.role.type),
+                literal(data.content, columns.content.type),
+                literal(data.attachments, columns.attachments.type),
+            ).where(owned_session),
+        )
+        .returning(ChatMessage.id)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def _load_history_and_conditions(
+    db, session_id: int, user_id: int
+) -> tuple[list[ChatMessage], list[HealthCondition]]:
+    """
+    一次查询同时取回最近历史消息与用户健康状况
+
+    两个查询通过 UNION ALL 合并，用 kind 列区分来源；枚举统一转为字符串后再还原。
+    返回的对象均为未加入会话的临时对象，只用于构建提示词与知识检索。
+    """
+    recent = (
+        select(ChatMessage.id)
         .where(ChatMessage.session_id == session_id)
         .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
         .limit(settings.chat_history_limit)
+        .scalar_subquery()
     )
-    history = list(result.scalars().all())
-    history.reverse()
-    return history
+    history_query = select(
+        literal("msg").label("kind"),
+        ChatMessage.id.label("id"),
+        cast(ChatMessage.role, String).label("role"),
+        ChatMessage.content.label("content"),
+        ChatMessage.created_at.label("created_at"),
+        null().label("condition_code"),
+        null().label("title"),
+        null().label("condition_type"),
+        null().label("status"),
+        null().label("value"),
+        null().label("unit"),
+    ).where(ChatMessage.id.in_(recent))
+    conditions_query = select(
+        literal("cond"),
+        HealthCondition.id,
+        null(),
+        null(),
+        null(),
+        HealthCondition.condition_code,
+        HealthCondition.title,
+        cast(HealthCondition.condition_type, String),
+        cast(HealthCondition.status, String),
+        HealthCondition.value,
+        HealthCondition.unit,
+    ).where(HealthCondition.user_id == user_id)
+    result = await db.execute(union_all(history_query, conditions_query))
+
+    history: list[ChatMessage] = []
+    conditions: list[HealthCondition] = []
+    for row in result.all():
+        if row.kind == "msg":
+            history.append(
+                ChatMessage(
+                    id=row.id,
+                    session_id=session_id,
+                    role=MessageRole(row.role),
+                    content=row.content,
+                    created_at=row.created_at,
+                )
+            )
+        else:
+            conditions.append(
+                HealthCondition(
+                    id=row.id,
+                    user_id=user_id,
+                    condition_code=row.condition_code,
+                    title=row.title,
+                    condition_type=ConditionType(row.condition_type),
+                    status=ConditionStatus(row.status) if row.status else None,
+                    value=row.value,
+                    unit=row.unit,
+                )
+            )
+    history.sort(key=lambda msg: (msg.created_at, msg.id))
+    return history, conditions
 
 
 def _history_to_prompt_messages(history: list[ChatMessage]) -> tuple[list[dict[str, str]], int]:
@@ -119,14 +223,15 @@ def _knowledge_attachment(
 
 
 def _sse_event(event: str, data: dict[str, Any]) -> str:
-    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    # orjson 直接输出 UTF-8，中文无需转义
+    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
 
 
 def _log_chat_timing(request_id: str, timings: dict[str, Any]) -> None:
     safe_timings = {"request_id": request_id, **timings}
     logging.getLogger("uvicorn.error").info(
         "chat_timing %s",
-        json.dumps(safe_timings, ensure_ascii=False, sort_keys=True),
+        orjson.dumps(safe_timings, option=orjson.OPT_SORT_KEYS).decode(),
     )
 
 
@@ -155,7 +260,6 @@ async def create_session(
     )
     db.add(session)
     await db.flush()
-    await db.refresh(session)
     
     return ChatSessionResponse(
         id=session.id,
@@ -171,86 +275,98 @@ async def list_sessions(
     current_user: CurrentUser,
     db: DbSession,
     page: int = 1,
-    size: int = 20
+    size: int = 20,
+    cursor: Optional[str] = None
 ):
-    """获取对话会话列表"""
-    # 计算偏移量
-    offset = (page - 1) * size
-    
-    # 构建查询：联合查询会话和消息计数
-    from sqlalchemy import func
+    """
+    获取对话会话列表
     
-    # 基础查询
+    传入 cursor（取自上一页的 next_cursor）时按游标分页，忽略 page 且不统计总数。
+    """
     query = (
-        select(
-            ChatSession,
-            func.count(ChatMessage.id).label("message_count")
-        )
-        .outerjoin(ChatMessage, ChatMessage.session_id == ChatSession.id)
+        select(ChatSession)
         .where(ChatSession.user_id == current_user.id)
-        .group_by(ChatSession.id)
-        .order_by(ChatSession.updated_at.desc())
+        .options(raiseload("*"))
+        .order_by(ChatSession.updated_at.desc(), ChatSession.id.desc())
+        .limit(size)
     )
     
-    # 获取总数
-    count_query = select(func.count(ChatSession.id)).where(ChatSession.user_id == current_user.id)
-    total = (await db.execute(count_query)).scalar_one()
+    if cursor:
+        # 游标分页：从上一页最后一个会话之后继续读取
+        updated_at, session_id = decode_cursor(cursor, 2)
+        try:
+            after = (datetime.fromisoformat(updated_at), int(session_id))
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="无效的分页游标"
+            )
+        query = query.where(tuple_(ChatSession.updated_at, ChatSession.id) < tuple_(*after))
+        total = total_pages = None
+    else:
+        count_query = select(func.count(ChatSession.id)).where(ChatSession.user_id == current_user.id)
+        total = (await db.execute(count_query)).scalar_one()
+        total_pages = (total + size - 1) // size
+        query = query.offset((page - 1) * size)
+    
+    # 先分页取会话，再只统计当前页会话的消息数
+    result = await db.execute(query)
+    sessions = result.scalars().all()
     
-    # 应用分页
-    result = await db.execute(query.offset(offset).limit(size))
-    rows = result.all()
+    message_counts: dict[int, int] = {}
+    if sessions:
+        count_result = await db.execute(
+            select(ChatMessage.session_id, func.count(ChatMessage.id))
+            .where(ChatMessage.session_id.in_([session.id for session in sessions]))
+            .group_by(ChatMessage.session_id)
+        )
+        message_counts = dict(count_result.all())
     
-    responses = []
-    for session, message_count in rows:
-        responses.append(ChatSessionResponse(
+    responses = [
+        ChatSessionResponse(
             id=session.id,
             title=session.title,
             created_at=session.created_at,
             updated_at=session.updated_at,
-            message_count=message_count
-        ))
+            message_count=message_counts.get(session.id, 0)
+        )
+        for session in sessions
+    ]
     
-    return PaginatedResponse(
+    return model_json_response(PaginatedResponse[ChatSessionResponse](
         items=responses,
         total=total,
         page=page,
         page_size=size,
-        total_pages=(total + size - 1) // size
-    )
+        total_pages=total_pages,
+        next_cursor=(
+            encode_cursor(sessions[-1].updated_at, sessions[-1].id)
+            if len(sessions) == size else None
+        )
+    ))
 
 
 @router.get("/sessions/{session_id}", response_model=ChatSessionDetailResponse)
 async def get_session(session_id: int, current_user: CurrentUser, db: DbSession):
     """获取对话会话详情（含消息列表）"""
-    result = await db.execute(
-        select(ChatSession).where(
-            ChatSession.id == session_id,
-            ChatSession.user_id == current_user.id
-        )
-    )
-    session = result.scalar_one_or_none()
-    
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="会话不存在"
-        )
+    session = await get_owned(db, ChatSession, session_id, current_user.id, "会话不存在")
     
     # 获取消息
     msg_result = await db.execute(
         select(ChatMessage)
         .where(ChatMessage.session_id == session_id)
+        .options(raiseload("*"))
         .order_by(ChatMessage.created_at)
     )
     messages = msg_result.scalars().all()
     
-    return ChatSessionDetailResponse(
+    return model_json_response(ChatSessionDetailResponse(
         id=session.id,
         title=session.title,
         created_at=session.created_at,
         updated_at=session.updated_at,
-        messages=[ChatMessageResponse.model_validate(m) for m in messages]
-    )
+        messages=_MESSAGE_LIST_ADAPTER.validate_python(messages, from_attributes=True)
+    ))
 
 
 @router.post("/sessions/{session_id}/messages", response_model=ChatMessageResponse)
@@ -272,50 +388,27 @@ async def send_message(
         "request_type": "json",
     }
 
-    # 验证会话存在
+    # 验证会话归属并保存用户消息
     stage_start = time.perf_counter()
-    result = await db.execute(
-        select(ChatSession).where(
-            ChatSession.id == session_id,
-            ChatSession.user_id == current_user.id
-        )
-    )
-    session = result.scalar_one_or_none()
-    timings["session_lookup_ms"] = _elapsed_ms(stage_start)
+    user_message_id = await _insert_user_message(db, session_id, current_user.id, data)
+    timings["user_message_insert_ms"] = _elapsed_ms(stage_start)
     
-    if not session:
+    if user_message_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="会话不存在"
         )
     
-    # 保存用户消息
+    # 获取历史消息与用户健康状况
     stage_start = time.perf_counter()
-    user_message = ChatMessage(
-        session_id=session_id,
-        role=MessageRole.USER,
-        content=data.content,
-        attachments=data.attachments
-    )
-    db.add(user_message)
-    await db.flush()
-    timings["user_message_flush_ms"] = _elapsed_ms(stage_start)
-    
-    # 获取历史消息
-    stage_start = time.perf_counter()
-    history = await _load_recent_history(db, session_id)
-    timings["history_query_ms"] = _elapsed_ms(stage_start)
+    history, conditions = await _load_history_and_conditions(db, session_id, current_user.id)
+    timings["history_conditions_query_ms"] = _elapsed_ms(stage_start)
     timings["history_message_count"] = len(history)
     
     # 构建消息列表
     messages, history_chars = _history_to_prompt_messages(history)
     timings["history_chars"] = history_chars
     
-    # 获取用户健康状况
-    stage_start = time.perf_counter()
-    conditions = await get_user_conditions(current_user.id, db)
-    timings["conditions_query_ms"] = _elapsed_ms(stage_start)
-    
     stage_start = time.perf_counter()
     summary = await knowledge_service.summarize_query_for_user(
         db,
@@ -348,6 +441,10 @@ async def send_message(
             FallbackStatus.LOCAL_PARTIAL_ALLOW_CLOUD: "本地已命中部分知识，调用云端补充解释与替代建议。",
             FallbackStatus.NO_LOCAL_MATCH_ALLOW_CLOUD: "本地知识未命中，调用云端兜底。",
         }.get(summary.fallback_status, "调用云端补充说明。")
+        # 调用模型前先提交用户消息，释放数据库连接，避免整个模型响应期间占用连接池
+        stage_start = time.perf_counter()
+        await _commit_if_supported(db)
+        timings["user_message_commit_ms"] = _elapsed_ms(stage_start)
         ai_response = await doubao_service.chat(
             messages=messages,
             user=current_user,
@@ -378,7 +475,6 @@ async def send_message(
     )
     db.add(assistant_message)
     await db.flush()
-    await db.refresh(assistant_message)
     timings["assistant_flush_ms"] = _elapsed_ms(stage_start)
 
     stage_start = time.perf_counter()
@@ -441,40 +537,20 @@ async def send_message_stream(
         try:
             yield _sse_event("status", {"stage": "session_lookup", "message": "正在确认会话..."})
             stage_start = time.perf_counter()
-            result = await db.execute(
-                select(ChatSession).where(
-                    ChatSession.id == session_id,
-                    ChatSession.user_id == current_user.id
-                )
-            )
-            session = result.scalar_one_or_none()
-            timings["session_lookup_ms"] = _elapsed_ms(stage_start)
-            if not session:
+            user_message_id = await _insert_user_message(db, session_id, current_user.id, data)
+            timings["user_message_insert_ms"] = _elapsed_ms(stage_start)
+            if user_message_id is None:
                 yield _sse_event("error", {"message": "会话不存在", "request_id": request_id})
                 return
 
             stage_start = time.perf_counter()
-            user_message = ChatMessage(
-                session_id=session_id,
-                role=MessageRole.USER,
-                content=data.content,
-                attachments=data.attachments,
-            )
-            db.add(user_message)
-            await db.flush()
-            timings["user_message_flush_ms"] = _elapsed_ms(stage_start)
-
-            stage_start = time.perf_counter()
-            history = await _load_recent_history(db, session_id)
-            timings["history_query_ms"] = _elapsed_ms(stage_start)
+            history, conditions = await _load_history_and_conditions(db, session_id, current_user.id)
+            timings["history_conditions_query_ms"] = _elapsed_ms(stage_start)
             timings["history_message_count"] = len(history)
             messages, history_chars = _history_to_prompt_messages(history)
             timings["history_chars"] = history_chars
 
             yield _sse_event("status", {"stage": "knowledge_check", "message": "正在检查本地饮食规则..."})
-            stage_start = time.perf_counter()
-            conditions = await get_user_conditions(current_user.id, db)
-            timings["conditions_query_ms"] = _elapsed_ms(stage_start)
 
             stage_start = time.perf_counter()
             summary = await knowledge_service.summarize_query_for_user(
@@ -510,6 +586,10 @@ async def send_message_stream(
                     FallbackStatus.NO_LOCAL_MATCH_ALLOW_CLOUD: "本地知识未命中，调用云端兜底。",
                 }.get(summary.fallback_status, "调用云端补充说明。")
                 yield _sse_event("status", {"stage": "model_connect", "message": "正在连接模型..."})
+                # 流式生成可能持续数秒，先提交用户消息并释放数据库连接
+                stage_start = time.perf_counter()
+                await _commit_if_supported(db)
+                timings["user_message_commit_ms"] = _elapsed_ms(stage_start)
                 ai_metrics: dict[str, Any] = {}
                 stream = await doubao_service.chat(
                     messages=messages,
@@ -550,7 +630,6 @@ async def send_message_stream(
             )
             db.add(assistant_message)
             await db.flush()
-            await db.refresh(assistant_message)
             timings["assistant_flush_ms"] = _elapsed_ms(stage_start)
 
             stage_start = time.perf_counter()
@@ -633,23 +712,19 @@ async def send_message_stream(
 @router.delete("/sessions/{session_id}")
 async def delete_session(session_id: int, current_user: CurrentUser, db: DbSession):
     """删除对话会话"""
+    # 直接按归属条件删除，消息由数据库外键级联删除
     result = await db.execute(
-        select(ChatSession).where(
+        delete(ChatSession).where(
             ChatSession.id == session_id,
             ChatSession.user_id == current_user.id
         )
     )
-    session = result.scalar_one_or_none()
-    
-    if not session:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="会话不存在"
         )
     
-    await db.delete(session)
-    await db.flush()
-    
     return {"success": True, "message": "删除成功"}
 
 
@@ -739,29 +814,32 @@ async def recognize_food_upload(
             detail="请上传图片文件"
         )
     
-    # 读取并编码
-    content = await file.read()
-    
-    # 检查文件大小
-    from app.core.config import settings
+    # 分块读取，超过大小限制立即中止
     max_size = settings.max_upload_size_mb * 1024 * 1024
-    if len(content) > max_size:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"文件大小超过限制（最大 {settings.max_upload_size_mb}MB）"
-        )
+    content = bytearray()
+    while chunk := await file.read(_UPLOAD_CHUNK_SIZE):
+        content += chunk
+        if len(content) > max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"文件大小超过限制（最大 {settings.max_upload_size_mb}MB）"
+            )
     
-    image_base64 = base64.b64encode(content).decode("utf-8")
+    # 由原始字节直接生成 data URL；大图编码放到线程中执行，避免阻塞事件循环
+    image_url = await asyncio.to_thread(
+        doubao_service.image_bytes_data_url,
+        bytes(content),
+        file.content_type.split("/", 1)[1] if file.content_type else "jpeg"
+    )
     
     # 获取用户健康状况
     conditions = await get_user_conditions(current_user.id, db)
     
     # 调用 AI 识别
     foods, ai_response = await doubao_service.recognize_food(
-        image_base64=image_base64,
+        image_url=image_url,
         user=current_user,
         conditions=conditions,
-        image_type=file.content_type.split("/", 1)[1] if file.content_type else "jpeg",
         user_prompt=prompt,
     )
     
@@ -847,17 +925,7 @@ async def quick_log_from_recognition(
     快速从识别结果添加饮食记录（前端传入 food_item）
     """
     if data.session_id is not None:
-        session_result = await db.execute(
-            select(ChatSession).where(
-                ChatSession.id == data.session_id,
-                ChatSession.user_id == current_user.id
-            )
-        )
-        if not session_result.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="会话不存在"
-            )
+        await get_owned(db, ChatSession, data.session_id, current_user.id, "会话不存在")
 
     try:
         meal_type = MealType(data.meal_type.upper())
@@ -5,16 +5,17 @@
 from typing import List
 
 from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import bindparam, delete, select
+from sqlalchemy.orm import raiseload
 
-from app.api.deps import DbSession, CurrentUser
+from app.api.deps import DbSession, CurrentUser, get_owned
 from app.models.health_condition import (
     HealthCondition,
     ConditionType,
     ConditionStatus,
     TrendType
 )
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import Optional
 from datetime import datetime
 
@@ -61,8 +62,17 @@ class ConditionResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# 常用查询在模块级构建一次，执行时只绑定参数
+_CONDITION_BY_CODE_QUERY = select(HealthCondition).where(
+    HealthCondition.user_id == bindparam("user_id"),
+    HealthCondition.condition_code == bindparam("condition_code")
+).options(raiseload("*"))
+
+# 列表响应一次性批量校验，避免逐条 model_validate
+_CONDITION_LIST_ADAPTER = TypeAdapter(List[ConditionResponse])
 
 
 router = APIRouter(prefix="/conditions", tags=["健康档案"])
@@ -77,10 +87,8 @@ async def create_condition(
     """添加健康状况记录"""
     # 检查是否已存在相同的 condition_code
     result = await db.execute(
-        select(HealthCondition).where(
-            HealthCondition.user_id == current_user.id,
-            HealthCondition.condition_code == data.condition_code
-        )
+        _CONDITION_BY_CODE_QUERY,
+        {"user_id": current_user.id, "condition_code": data.condition_code}
     )
     existing = result.scalar_one_or_none()
     if existing:
@@ -95,7 +103,6 @@ async def create_condition(
     )
     db.add(condition)
     await db.flush()
-    await db.refresh(condition)
     
     return ConditionResponse.model_validate(condition)
 
@@ -106,10 +113,11 @@ async def list_conditions(current_user: CurrentUser, db: DbSession):
     result = await db.execute(
         select(HealthCondition)
         .where(HealthCondition.user_id == current_user.id)
+        .options(raiseload("*"))
         .order_by(HealthCondition.created_at.desc())
     )
     conditions = result.scalars().all()
-    return [ConditionResponse.model_validate(c) for c in conditions]
+    return _CONDITION_LIST_ADAPTER.validate_python(conditions, from_attributes=True)
 
 
 @router.get("/chronic", response_model=List[ConditionResponse])
@@ -119,10 +127,10 @@ async def list_chronic_conditions(current_user: CurrentUser, db: DbSession):
         select(HealthCondition).where(
             HealthCondition.user_id == current_user.id,
             HealthCondition.condition_type == ConditionType.CHRONIC
-        )
+        ).options(raiseload("*"))
     )
     conditions = result.scalars().all()
-    return [ConditionResponse.model_validate(c) for c in conditions]
+    return _CONDITION_LIST_ADAPTER.validate_python(conditions, from_attributes=True)
 
 
 @router.get("/allergies", response_model=List[ConditionResponse])
@@ -132,28 +140,16 @@ async def list_allergies(current_user: CurrentUser, db: DbSession):
         select(HealthCondition).where(
             HealthCondition.user_id == current_user.id,
             HealthCondition.condition_type == ConditionType.ALLERGY
-        )
+        ).options(raiseload("*"))
     )
     conditions = result.scalars().all()
-    return [ConditionResponse.model_validate(c) for c in conditions]
+    return _CONDITION_LIST_ADAPTER.validate_python(conditions, from_attributes=True)
 
 
 @router.get("/{condition_id}", response_model=ConditionResponse)
 async def get_condition(condition_id: int, current_user: CurrentUser, db: DbSession):
     """获取单个健康状况"""
-    result = await db.execute(
-        select(HealthCondition).where(
-            HealthCondition.id == condition_id,
-            HealthCondition.user_id == current_user.id
-        )
-    )
-    condition = result.scalar_one_or_none()
-    
-    if not condition:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="记录不存在"
-        )
+    condition = await get_owned(db, HealthCondition, condition_id, current_user.id)
     
     return ConditionResponse.model_validate(condition)
 
@@ -166,26 +162,13 @@ async def update_condition(
     db: DbSession
 ):
     """更新健康状况"""
-    result = await db.execute(
-        select(HealthCondition).where(
-            HealthCondition.id == condition_id,
-            HealthCondition.user_id == current_user.id
-        )
-    )
-    condition = result.scalar_one_or_none()
-    
-    if not condition:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="记录不存在"
-        )
+    condition = await get_owned(db, HealthCondition, condition_id, current_user.id)
     
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(condition, field, value)
     
     await db.flush()
-    await db.refresh(condition)
     
     return ConditionResponse.model_validate(condition)
 
@@ -194,20 +177,15 @@ async def update_condition(
 async def delete_condition(condition_id: int, current_user: CurrentUser, db: DbSession):
     """删除健康状况"""
     result = await db.execute(
-        select(HealthCondition).where(
+        delete(HealthCondition).where(
             HealthCondition.id == condition_id,
             HealthCondition.user_id == current_user.id
         )
     )
-    condition = result.scalar_one_or_none()
-    
-    if not condition:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="记录不存在"
         )
     
-    await db.delete(condition)
-    await db.flush()
-    
     return {"success": True, "message": "删除成功"}
@@ -1,10 +1,11 @@
 """Multimodal intake parsing and confirmation APIs."""
 
-import base64
+import asyncio
 from typing import Optional
 
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile, status
 from sqlalchemy import select
+from sqlalchemy.orm import raiseload
 
 from app.api.deps import CurrentUser, DbSession
 from app.models.health_condition import HealthCondition
@@ -27,7 +28,9 @@ intake_service = IntakeService()
 
 
 async def get_user_conditions(user_id: int, db: DbSession) -> list[HealthCondition]:
-    result = await db.execute(select(HealthCondition).where(HealthCondition.user_id == user_id))
+    result = await db.execute(
+        select(HealthCondition).where(HealthCondition.user_id == user_id).options(raiseload("*"))
+    )
     return list(result.scalars().all())
 
 
@@ -140,14 +143,14 @@ async def recognize_and_parse_photo_upload(
         )
 
     conditions = await get_user_conditions(current_user.id, db)
-    image_base64 = base64.b64encode(content).decode("utf-8")
     image_type = file.content_type.split("/", 1)[1] if file.content_type else "jpeg"
+    # 由原始字节直接生成 data URL；大图编码放到线程中执行，避免阻塞事件循环
+    image_url = await asyncio.to_thread(doubao_service.image_bytes_data_url, content, image_type)
 
     foods, ai_response = await doubao_service.recognize_food(
-        image_base64=image_base64,
+        image_url=image_url,
         user=current_user,
         conditions=conditions,
-        image_type=image_type,
         user_prompt=prompt,
         fast=fast,
     )
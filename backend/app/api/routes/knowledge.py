@@ -4,6 +4,7 @@ from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query, status
 from sqlalchemy import select
+from sqlalchemy.orm import raiseload
 
 from app.api.deps import CurrentUser, DbSession
 from app.models.health_condition import HealthCondition
@@ -28,7 +29,11 @@ knowledge_service = KnowledgeService()
 async def _get_user_conditions(user_id: int, db: DbSession) -> list[HealthCondition]:
     return list(
         (
-            await db.execute(select(HealthCondition).where(HealthCondition.user_id == user_id))
+            await db.execute(
+                select(HealthCondition)
+                .where(HealthCondition.user_id == user_id)
+                .options(raiseload("*"))
+            )
         ).scalars().all()
     )
 
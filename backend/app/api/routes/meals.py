@@ -2,19 +2,25 @@
 饮食记录 API 路由
 """
 
+import asyncio
 from datetime import date, datetime, timedelta
 from typing import Optional, List
 
 from fastapi import APIRouter, HTTPException, status, Query
-from sqlalchemy import select, and_, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import bindparam, select, and_, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import raiseload
 
-from app.api.deps import DbSession, CurrentUser
+from app.api.deps import DbSession, DbSessionRO, CurrentUser, decode_cursor, encode_cursor
+from app.core.database import async_session_maker
+from app.core.orjson_response import ORJSONResponse, model_json_response
 from app.models.meal import Meal, SyncStatus
+from app.services.daily_summary import adjust_daily_intake, load_daily_summary
 from app.schemas.meal import (
     MealCreate,
     MealUpdate,
     MealResponse,
+    MEAL_LIST_ADAPTER,
     MealSyncRequest,
     MealSyncResponse,
     DailyIntakeSummary
@@ -23,24 +29,61 @@ from app.schemas.common import PaginatedResponse
 
 router = APIRouter(prefix="/meals", tags=["饮食记录"])
 
+# 今日记录只取 MealResponse 需要的列，按行直接序列化，不经过 ORM 对象与响应校验
+_TODAY_MEALS_QUERY = (
+    select(*(getattr(Meal, name) for name in MealResponse.model_fields))
+    .where(
+        Meal.user_id == bindparam("user_id"),
+        Meal.record_date == bindparam("record_date")
+    )
+    .order_by(Meal.created_at.desc())
+)
+
 
 async def _get_meal_or_404(meal_id: int, current_user: CurrentUser, db: DbSession) -> Meal:
-    result = await db.execute(select(Meal).where(Meal.id == meal_id))
-    meal = result.scalar_one_or_none()
+    # 按主键读取，优先命中会话 identity map；不属于当前用户同样返回 404，避免暴露记录是否存在
+    meal = await db.get(Meal, meal_id)
 
-    if not meal:
+    if meal is None or meal.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="记录不存在"
         )
 
-    if meal.user_id != current_user.id:
+    return meal
+
+
+def _insert_meals_skipping_existing(rows: list[dict]):
+    """批量插入饮食记录，(user_id, client_id) 已存在的行跳过，只返回实际插入的记录"""
+    return (
+        pg_insert(Meal)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[Meal.user_id, Meal.client_id])
+        .returning(Meal)
+    )
+
+
+def _encode_meal_cursor(meal: Meal) -> str:
+    """以排序键 (record_date, created_at, id) 生成下一页游标"""
+    return encode_cursor(meal.record_date, meal.created_at, meal.id)
+
+
+def _decode_meal_cursor(cursor: str) -> tuple[date, datetime, int]:
+    record_date, created_at, meal_id = decode_cursor(cursor, 3)
+    try:
+        return date.fromisoformat(record_date), datetime.fromisoformat(created_at), int(meal_id)
+    except (ValueError, TypeError):
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="无权操作该饮食记录"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的分页游标"
         )
 
-    return meal
+
+async def _count_in_new_session(count_query) -> int:
+    """在独立会话中执行计数，便于与当前会话的查询并发"""
+    async with async_session_maker() as session:
+        result = await session.execute(count_query)
+        return result.scalar() or 0
 
 
 @router.post("", response_model=MealResponse, status_code=status.HTTP_201_CREATED)
@@ -50,124 +93,116 @@ async def create_meal(
     db: DbSession
 ):
     """创建饮食记录"""
-    # 检查 client_id 是否已存在（防止重复提交）
+    # 直接插入，client_id 已存在时不插入（防止重复提交），新记录只需一次往返
+    result = await db.execute(
+        _insert_meals_skipping_existing([{
+            "user_id": current_user.id,
+            "sync_status": SyncStatus.SYNCED,
+            **data.model_dump()
+        }])
+    )
+    meal = result.scalar_one_or_none()
+    if meal is not None:
+        await adjust_daily_intake(db, [meal])
+        return MealResponse.model_validate(meal)
+    
+    # 重复提交：返回已有记录
     result = await db.execute(
         select(Meal).where(
             Meal.user_id == current_user.id,
             Meal.client_id == data.client_id
-        )
-    )
-    existing = result.scalar_one_or_none()
-    if existing:
-        return MealResponse.model_validate(existing)
-    
-    meal = Meal(
-        user_id=current_user.id,
-        sync_status=SyncStatus.SYNCED,
-        **data.model_dump()
+        ).options(raiseload("*"))
     )
-    db.add(meal)
-    await db.flush()
-    await db.refresh(meal)
-    
-    return MealResponse.model_validate(meal)
+    return MealResponse.model_validate(result.scalar_one())
 
 
 @router.get("", response_model=PaginatedResponse[MealResponse])
 async def list_meals(
     current_user: CurrentUser,
-    db: DbSession,
+    db: DbSessionRO,
     record_date: Optional[date] = Query(None, description="按日期筛选"),
     start_date: Optional[date] = Query(None, description="开始日期"),
     end_date: Optional[date] = Query(None, description="结束日期"),
     page: int = Query(1, ge=1, description="页码"),
-    page_size: int = Query(20, ge=1, le=100, description="每页数量")
+    page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="分页游标，取自上一页的 next_cursor")
 ):
     """
     获取饮食记录列表
     
-    支持按日期范围筛选，分页返回
+    支持按日期范围筛选，分页返回。
+    传入 cursor 时按游标（keyset）分页：从上一页最后一条之后继续读取，忽略 page，
+    且不统计总数；未传时按页码分页。
     """
-    query = select(Meal).where(Meal.user_id == current_user.id)
+    filters = [Meal.user_id == current_user.id]
     
     # 日期筛选
     if record_date:
-        query = query.where(Meal.record_date == record_date)
+        filters.append(Meal.record_date == record_date)
     elif start_date and end_date:
-        query = query.where(Meal.record_date.between(start_date, end_date))
+        filters.append(Meal.record_date.between(start_date, end_date))
     elif start_date:
-        query = query.where(Meal.record_date >= start_date)
+        filters.append(Meal.record_date >= start_date)
     elif end_date:
-        query = query.where(Meal.record_date <= end_date)
+        filters.append(Meal.record_date <= end_date)
     
-    # 统计总数
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-    
-    # 分页
-    query = query.order_by(Meal.record_date.desc(), Meal.created_at.desc())
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    query = (
+        select(Meal)
+        .options(raiseload("*"))
+        .order_by(Meal.record_date.desc(), Meal.created_at.desc(), Meal.id.desc())
+        .limit(page_size)
+    )
     
-    result = await db.execute(query)
+    if cursor:
+        # 游标分页：按排序键做范围查找，不跳过前面的行，也不统计总数
+        after = tuple_(Meal.record_date, Meal.created_at, Meal.id) < tuple_(*_decode_meal_cursor(cursor))
+        result = await db.execute(query.where(*filters, after))
+        total = total_pages = None
+    else:
+        # 统计总数：直接对同一筛选条件 count(*)，不包子查询
+        count_query = select(func.count()).select_from(Meal).where(*filters)
+        
+        # 计数走第二条连接与分页查询并发执行：多占用一条池连接，换取少一次往返等待
+        total, result = await asyncio.gather(
+            _count_in_new_session(count_query),
+            db.execute(query.where(*filters).offset((page - 1) * page_size))
+        )
+        total_pages = (total + page_size - 1) // page_size
     meals = result.scalars().all()
     
-    return PaginatedResponse(
-        items=[MealResponse.model_validate(m) for m in meals],
+    return model_json_response(PaginatedResponse[MealResponse](
+        items=MEAL_LIST_ADAPTER.validate_python(meals, from_attributes=True),
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size
-    )
+        total_pages=total_pages,
+        next_cursor=_encode_meal_cursor(meals[-1]) if len(meals) == page_size else None
+    ))
 
 
 @router.get("/today", response_model=List[MealResponse])
-async def get_today_meals(current_user: CurrentUser, db: DbSession):
-    """获取今日饮食记录"""
-    today = date.today()
+async def get_today_meals(current_user: CurrentUser, db: DbSessionRO):
+    """
+    获取今日饮食记录
+    
+    首页高频接口：列与 MealResponse 字段一一对应，直接返回 ORJSONResponse，
+    response_model 仅用于接口文档。
+    """
     result = await db.execute(
-        select(Meal).where(
-            Meal.user_id == current_user.id,
-            Meal.record_date == today
-        ).order_by(Meal.created_at.desc())
+        _TODAY_MEALS_QUERY,
+        {"user_id": current_user.id, "record_date": date.today()}
     )
-    meals = result.scalars().all()
-    return [MealResponse.model_validate(m) for m in meals]
+    return ORJSONResponse([dict(row) for row in result.mappings()])
 
 
 @router.get("/summary", response_model=DailyIntakeSummary)
 async def get_daily_summary(
     current_user: CurrentUser,
-    db: DbSession,
+    db: DbSessionRO,
     target_date: date = Query(default_factory=date.today, description="目标日期")
 ):
     """获取某日摄入汇总"""
-    result = await db.execute(
-        select(
-            func.sum(Meal.calories).label("calories"),
-            func.sum(Meal.sodium).label("sodium"),
-            func.sum(Meal.purine).label("purine"),
-            func.sum(Meal.protein).label("protein"),
-            func.sum(Meal.carbs).label("carbs"),
-            func.sum(Meal.fat).label("fat"),
-            func.count(Meal.id).label("count")
-        ).where(
-            Meal.user_id == current_user.id,
-            Meal.record_date == target_date
-        )
-    )
-    row = result.one()
-    
-    return DailyIntakeSummary(
-        date=target_date,
-        total_calories=row.calories or 0,
-        total_sodium=row.sodium or 0,
-        total_purine=row.purine or 0,
-        total_protein=row.protein or 0,
-        total_carbs=row.carbs or 0,
-        total_fat=row.fat or 0,
-        meal_count=row.count or 0
-    )
+    return await load_daily_summary(db, current_user.id, target_date)
 
 
 @router.get("/{meal_id}", response_model=MealResponse)
@@ -187,12 +222,15 @@ async def update_meal(
     """更新饮食记录"""
     meal = await _get_meal_or_404(meal_id, current_user, db)
     
+    # 先从汇总中扣除旧值，更新后再累加新值
+    await adjust_daily_intake(db, [meal], sign=-1)
+    
     update_data = data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(meal, field, value)
     
     await db.flush()
-    await db.refresh(meal)
+    await adjust_daily_intake(db, [meal])
     
     return MealResponse.model_validate(meal)
 
@@ -202,6 +240,7 @@ async def delete_meal(meal_id: int, current_user: CurrentUser, db: DbSession):
     """删除饮食记录"""
     meal = await _get_meal_or_404(meal_id, current_user, db)
     
+    await adjust_daily_intake(db, [meal], sign=-1)
     await db.delete(meal)
     await db.flush()
     
@@ -219,36 +258,35 @@ async def sync_meals(
     
     客户端上传离线期间产生的记录，服务端返回需要同步到客户端的记录
     """
-    synced_count = 0
     conflicts = []
     
+    # 同一批次内重复的 client_id 只保留第一条，其余记为冲突
+    rows = []
+    seen_ids: set[str] = set()
     for meal_data in data.meals:
-        # 检查是否已存在
-        result = await db.execute(
-            select(Meal).where(
-                Meal.user_id == current_user.id,
-                Meal.client_id == meal_data.client_id
-            )
-        )
-        existing = result.scalar_one_or_none()
-        
-        if existing:
-            # 冲突处理：以服务器数据为准，记录冲突
+        if meal_data.client_id in seen_ids:
             conflicts.append(meal_data.client_id)
-        else:
-            # 新建记录
-            meal = Meal(
-                user_id=current_user.id,
-                sync_status=SyncStatus.SYNCED,
-                **meal_data.model_dump()
-            )
-            db.add(meal)
-            synced_count += 1
+            continue
+        seen_ids.add(meal_data.client_id)
+        rows.append({
+            "user_id": current_user.id,
+            "sync_status": SyncStatus.SYNCED,
+            **meal_data.model_dump()
+        })
     
-    await db.flush()
+    # 一条语句批量插入；服务端已存在的记录不覆盖，以服务器数据为准，记录冲突
+    new_meals = []
+    if rows:
+        result = await db.execute(_insert_meals_skipping_existing(rows))
+        new_meals = result.scalars().all()
+        await adjust_daily_intake(db, new_meals)
+    
+    inserted_ids = {meal.client_id for meal in new_meals}
+    conflicts.extend(row["client_id"] for row in rows if row["client_id"] not in inserted_ids)
+    synced_count = len(new_meals)
     
     # 获取服务端更新的记录（用于客户端同步）
-    server_query = select(Meal).where(Meal.user_id == current_user.id)
+    server_query = select(Meal).where(Meal.user_id == current_user.id).options(raiseload("*"))
     if data.last_sync_at:
         server_query = server_query.where(Meal.updated_at > data.last_sync_at)
     server_query = server_query.order_by(Meal.updated_at.desc()).limit(100)
@@ -256,8 +294,8 @@ async def sync_meals(
     result = await db.execute(server_query)
     server_meals = result.scalars().all()
     
-    return MealSyncResponse(
+    return model_json_response(MealSyncResponse(
         synced_count=synced_count,
         conflicts=conflicts,
-        server_meals=[MealResponse.model_validate(m) for m in server_meals]
-    )
+        server_meals=MEAL_LIST_ADAPTER.validate_python(server_meals, from_attributes=True)
+    ))
@@ -6,11 +6,13 @@ from typing import List
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, HTTPException, status, Query
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
+from sqlalchemy.orm import raiseload
 
-from app.api.deps import DbSession, CurrentUser
+from app.api.deps import DbSession, DbSessionRO, CurrentUser
+from app.core.cache import TTLCache
 from app.models.message import AppMessage, MessageType
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import Optional
 
 
@@ -35,23 +37,47 @@ class MessageResponse(BaseModel):
     created_at: datetime
     read_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 router = APIRouter(prefix="/messages", tags=["消息通知"])
 
+# 消息列表一次性批量校验
+_MESSAGE_LIST_ADAPTER = TypeAdapter(List[MessageResponse])
+
+# 未读数缓存：user_id -> 未读消息数
+# 客户端轮询该接口；新消息由外部写入，最多延迟一个有效期后可见
+_UNREAD_COUNT_CACHE: TTLCache[int, int] = TTLCache(maxsize=50_000, ttl=10.0)
+
+
+def invalidate_unread_count(user_id: int) -> None:
+    """用户消息的已读状态或数量变化后调用，下次请求重新统计"""
+    _UNREAD_COUNT_CACHE.pop(user_id)
+
+
+async def _get_message_or_404(message_id: int, current_user: CurrentUser, db: DbSession) -> AppMessage:
+    # 按主键读取，优先命中会话 identity map；不属于当前用户同样返回 404
+    message = await db.get(AppMessage, message_id)
+
+    if message is None or message.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="消息不存在"
+        )
+
+    return message
+
 
 @router.get("", response_model=List[MessageResponse])
 async def list_messages(
     current_user: CurrentUser,
-    db: DbSession,
+    db: DbSessionRO,
     unread_only: bool = Query(False, description="仅返回未读消息"),
     message_type: Optional[MessageType] = Query(None, description="消息类型筛选"),
     limit: int = Query(50, ge=1, le=100)
 ):
     """获取消息列表"""
-    query = select(AppMessage).where(AppMessage.user_id == current_user.id)
+    query = select(AppMessage).where(AppMessage.user_id == current_user.id).options(raiseload("*"))
     
     if unread_only:
         query = query.where(AppMessage.is_read == False)
@@ -64,38 +90,29 @@ async def list_messages(
     result = await db.execute(query)
     messages = result.scalars().all()
     
-    return [MessageResponse.model_validate(m) for m in messages]
+    return _MESSAGE_LIST_ADAPTER.validate_python(messages, from_attributes=True)
 
 
 @router.get("/unread-count")
-async def get_unread_count(current_user: CurrentUser, db: DbSession):
+async def get_unread_count(current_user: CurrentUser, db: DbSessionRO):
     """获取未读消息数量"""
-    result = await db.execute(
-        select(func.count(AppMessage.id)).where(
-            AppMessage.user_id == current_user.id,
-            AppMessage.is_read == False
+    count = _UNREAD_COUNT_CACHE.get(current_user.id)
+    if count is None:
+        result = await db.execute(
+            select(func.count(AppMessage.id)).where(
+                AppMessage.user_id == current_user.id,
+                AppMessage.is_read == False
+            )
         )
-    )
-    count = result.scalar() or 0
+        count = result.scalar() or 0
+        _UNREAD_COUNT_CACHE.set(current_user.id, count)
     return {"unread_count": count}
 
 
 @router.get("/{message_id}", response_model=MessageResponse)
 async def get_message(message_id: int, current_user: CurrentUser, db: DbSession):
     """获取单条消息"""
-    result = await db.execute(
-        select(AppMessage).where(
-            AppMessage.id == message_id,
-            AppMessage.user_id == current_user.id
-        )
-    )
-    message = result.scalar_one_or_none()
-    
-    if not message:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="消息不存在"
-        )
+    message = await _get_message_or_404(message_id, current_user, db)
     
     return MessageResponse.model_validate(message)
 
@@ -103,24 +120,13 @@ async def get_message(message_id: int, current_user: CurrentUser, db: DbSession)
 @router.post("/{message_id}/read")
 async def mark_as_read(message_id: int, current_user: CurrentUser, db: DbSession):
     """标记消息为已读"""
-    result = await db.execute(
-        select(AppMessage).where(
-            AppMessage.id == message_id,
-            AppMessage.user_id == current_user.id
-        )
-    )
-    message = result.scalar_one_or_none()
-    
-    if not message:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="消息不存在"
-        )
+    message = await _get_message_or_404(message_id, current_user, db)
     
     if not message.is_read:
         message.is_read = True
         message.read_at = datetime.now(timezone.utc)
         await db.flush()
+        invalidate_unread_count(current_user.id)
     
     return {"success": True, "message": "已标记为已读"}
 
@@ -129,41 +135,28 @@ async def mark_as_read(message_id: int, current_user: CurrentUser, db: DbSession
 async def mark_all_as_read(current_user: CurrentUser, db: DbSession):
     """标记所有消息为已读"""
     result = await db.execute(
-        select(AppMessage).where(
+        update(AppMessage)
+        .where(
             AppMessage.user_id == current_user.id,
             AppMessage.is_read == False
         )
+        .values(is_read=True, read_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
     )
-    messages = result.scalars().all()
+    invalidate_unread_count(current_user.id)
     
-    now = datetime.now(timezone.utc)
-    for msg in messages:
-        msg.is_read = True
-        msg.read_at = now
-    
-    await db.flush()
-    
-    return {"success": True, "message": f"已标记 {len(messages)} 条消息为已读"}
+    return {"success": True, "message": f"已标记 {result.rowcount} 条消息为已读"}
 
 
 @router.delete("/{message_id}")
 async def delete_message(message_id: int, current_user: CurrentUser, db: DbSession):
     """删除消息"""
-    result = await db.execute(
-        select(AppMessage).where(
-            AppMessage.id == message_id,
-            AppMessage.user_id == current_user.id
-        )
-    )
-    message = result.scalar_one_or_none()
-    
-    if not message:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="消息不存在"
-        )
+    message = await _get_message_or_404(message_id, current_user, db)
     
+    was_unread = not message.is_read
     await db.delete(message)
     await db.flush()
+    if was_unread:
+        invalidate_unread_count(current_user.id)
     
     return {"success": True, "message": "删除成功"}
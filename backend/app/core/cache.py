@@ -0,0 +1,54 @@
+"""
+进程内 TTL 缓存
+
+单进程部署下用于缓存 Token 解码结果、用户对象等短期数据，不跨进程共享。
+"""
+
+import time
+from typing import Generic, Hashable, Optional, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    带过期时间与容量上限的简单缓存
+
+    过期判断使用 time.monotonic()；超出容量时淘汰最早写入的条目。
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: dict[K, tuple[V, float]] = {}
+
+    def get(self, key: K) -> Optional[V]:
+        cached = self._data.get(key)
+        if cached is None:
+            return None
+        value, expires_at = cached
+        if time.monotonic() >= expires_at:
+            self._data.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """写入缓存，ttl 不超过默认有效期；ttl 不为正时不缓存"""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._data.pop(key, None)
+        while len(self._data) >= self.maxsize:
+            self._data.pop(next(iter(self._data)))
+        self._data[key] = (value, time.monotonic() + ttl)
+
+    def pop(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,23 @@
+"""
+响应压缩中间件
+
+在 Starlette GZipMiddleware 基础上跳过 SSE 流式接口：gzip 会缓冲小块数据，
+事件无法及时推送到客户端。
+"""
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import Receive, Scope, Send
+
+
+# 以这些后缀结尾的路径返回 text/event-stream，不做压缩
+_STREAM_PATH_SUFFIXES = ("/stream",)
+
+
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """对普通 JSON 响应启用 gzip，流式接口原样透传"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].endswith(_STREAM_PATH_SUFFIXES):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -1,31 +1,81 @@
 """数据库连接与会话管理。"""
 
-from typing import AsyncGenerator
+import asyncio
+from typing import Any, AsyncGenerator
 
-from sqlalchemy import text
+from sqlalchemy import event, make_url, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine
 )
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, ORMExecuteState, Session
 
 from app.core.config import settings
 
 
+def _connect_args() -> dict[str, Any]:
+    """asyncpg 连接参数：语句缓存、超时与服务端设置，其他驱动不传"""
+    if make_url(settings.database_url).get_driver_name() != "asyncpg":
+        return {}
+    connect_args: dict[str, Any] = {
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+        "command_timeout": settings.db_command_timeout_seconds,
+    }
+    if settings.db_disable_jit:
+        connect_args["server_settings"] = {"jit": "off"}
+    return connect_args
+
+
 # 创建异步数据库引擎
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
+    poolclass=AsyncAdaptedQueuePool,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle_seconds,
+    connect_args=_connect_args()
 )
 
+class WriteTrackingSession(Session):
+    """记录本次事务是否产生过写操作的同步会话，供 get_db 判断是否需要提交"""
+
+
+@event.listens_for(WriteTrackingSession, "after_flush")
+def _mark_flush_write(session: Session, _flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _mark_statement_write(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(WriteTrackingSession, "after_commit")
+@event.listens_for(WriteTrackingSession, "after_rollback")
+def _reset_write_flag(session: Session) -> None:
+    session.info.pop("has_writes", None)
+
+
+def _has_pending_writes(session: AsyncSession) -> bool:
+    return bool(
+        session.info.get("has_writes")
+        or session.new
+        or session.dirty
+        or session.deleted
+    )
+
+
 # 创建异步会话工厂
 async_session_maker = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=WriteTrackingSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False
@@ -47,7 +97,9 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         try:
             yield session
-            await session.commit()
+            # 只读请求不提交，事务随连接归还连接池时结束
+            if _has_pending_writes(session):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -55,13 +107,34 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_db_ro() -> AsyncGenerator[AsyncSession, None]:
+    """
+    只读数据库会话依赖注入
+
+    连接以 AUTOCOMMIT 模式执行，每条语句独立生效，不发送 BEGIN/COMMIT，
+    仅用于列表、汇总等只读接口。连接归还连接池时恢复默认隔离级别。
+
+    Yields:
+        AsyncSession: 异步数据库会话
+    """
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        async with AsyncSession(bind=conn, expire_on_commit=False, autoflush=False) as session:
+            yield session
+
+
 async def init_db() -> None:
     """初始化数据库连接。
 
     Schema 变更统一由 Alembic 管理，这里只做连接预热与健康校验。
+    并发建立多条连接后归还连接池，避免首批请求承担建连开销。
     """
-    async with engine.begin() as conn:
-        await conn.execute(text("SELECT 1"))
+    async def _warm_connection() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    prewarm = max(1, min(settings.db_pool_prewarm, settings.db_pool_size))
+    await asyncio.gather(*(_warm_connection() for _ in range(prewarm)))
 
 
 async def close_db() -> None:
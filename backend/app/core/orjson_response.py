@@ -0,0 +1,52 @@
+"""
+JSON 响应：基于 orjson 的默认响应类与 Pydantic 模型直出响应
+"""
+
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    """orjson 不能原生序列化的类型"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"无法序列化类型 {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    使用 orjson 序列化的响应类
+
+    datetime/date/枚举由 orjson 在 C 层直接处理；允许非字符串键的字典，
+    便于路由直接返回以 id 为键的映射。
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def model_json_response(model: BaseModel, status_code: int = 200) -> Response:
+    """
+    由 pydantic-core 直接把模型序列化为 JSON 响应
+
+    路由返回 Response 时 FastAPI 跳过 response_model 的二次校验与 jsonable_encoder，
+    response_model 仍保留在路由上，只用于接口文档。
+    """
+    return Response(
+        content=model.__pydantic_serializer__.to_json(model),
+        status_code=status_code,
+        media_type="application/json"
+    )
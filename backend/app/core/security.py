@@ -2,17 +2,36 @@
 安全模块：密码哈希与 JWT Token 管理
 """
 
+import asyncio
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Any, Union
 
-from jose import jwt, JWTError
+import jwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 
+# Token 解码结果缓存：以 Token 摘要为键，避免在内存中保留明文 Token
+_DECODE_CACHE: TTLCache[bytes, dict] = TTLCache(maxsize=10_000, ttl=60.0)
+
+# JWT 签名参数在启动时固定，模块加载时准备一次
+_JWT_KEY = settings.jwt_secret_key.encode()
+_JWT_ALGORITHM = settings.jwt_algorithm
+_JWT_ALGORITHMS = [settings.jwt_algorithm]
+
 # 密码哈希上下文
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 轮数上下限都固定为当前配置：调整 bcrypt_rounds 后，已有哈希在用户下次登录时按新轮数重算
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -25,6 +44,28 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """在线程池中验证密码，避免 bcrypt 计算阻塞事件循环"""
+    return await asyncio.to_thread(pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str,
+    hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """
+    在线程池中验证密码，并在哈希参数与当前配置不一致时返回重新计算的哈希
+    
+    返回 (是否通过, 新哈希)；无需更新或验证失败时新哈希为 None。
+    """
+    return await asyncio.to_thread(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """在线程池中生成密码哈希"""
+    return await asyncio.to_thread(pwd_context.hash, password)
+
+
 def create_access_token(
     subject: Union[str, Any],
     expires_delta: Optional[timedelta] = None
@@ -52,11 +93,7 @@ def create_access_token(
         "type": "access"
     }
     
-    return jwt.encode(
-        to_encode,
-        settings.jwt_secret_key,
-        algorithm=settings.jwt_algorithm
-    )
+    return jwt.encode(to_encode, _JWT_KEY, algorithm=_JWT_ALGORITHM)
 
 
 def create_refresh_token(
@@ -86,11 +123,7 @@ def create_refresh_token(
         "type": "refresh"
     }
     
-    return jwt.encode(
-        to_encode,
-        settings.jwt_secret_key,
-        algorithm=settings.jwt_algorithm
-    )
+    return jwt.encode(to_encode, _JWT_KEY, algorithm=_JWT_ALGORITHM)
 
 
 def decode_token(token: str) -> Optional[dict]:
@@ -102,13 +135,21 @@ def decode_token(token: str) -> Optional[dict]:
     
     Returns:
         解码后的 payload，失败则返回 None
+    
+    解码成功的结果会缓存一段时间（不超过 Token 自身的 exp），
+    同一 Token 重复携带时跳过签名校验与 JSON 解析；解码失败不缓存。
     """
-    try:
-        payload = jwt.decode(
-            token,
-            settings.jwt_secret_key,
-            algorithms=[settings.jwt_algorithm]
-        )
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = _DECODE_CACHE.get(key)
+    if payload is not None:
         return payload
-    except JWTError:
+    
+    try:
+        payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS)
+    except jwt.PyJWTError:
         return None
+    
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        _DECODE_CACHE.set(key, payload, exp - time.time())
+    return payload
@@ -8,8 +8,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 
+from app.core.compression import StreamAwareGZipMiddleware
 from app.core.config import settings
 from app.core.database import init_db, close_db
+from app.core.orjson_response import ORJSONResponse
 from app.api.routes import auth, meals, chat, conditions, messages, knowledge, intake
 
 
@@ -52,18 +54,25 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 # CORS 配置
+# 方法与请求头使用固定列表，预检响应可由浏览器缓存 max_age 秒
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type", "X-Requested-With"],
+    max_age=600,
 )
 
+# 响应压缩：识别结果、会话详情等含大段中文的响应超过 512 字节时 gzip 压缩
+# 压缩级别取 4，在压缩率与 CPU 开销之间折中；SSE 流式接口不压缩
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=512, compresslevel=4)
+
 # 注册路由
 app.include_router(auth.router, prefix="/api")
 app.include_router(meals.router, prefix="/api")
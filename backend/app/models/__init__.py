@@ -26,7 +26,7 @@ from app.models.knowledge import (
     SourceType,
     FallbackStatus,
 )
-from app.models.meal import FoodCategory, Meal, MealSource, MealType, SyncStatus
+from app.models.meal import DailyIntake, FoodCategory, Meal, MealSource, MealType, SyncStatus
 from app.models.message import AppMessage, MessageType
 from app.models.user import Gender, User
 
@@ -37,6 +37,7 @@ __all__ = [
     "ConditionScopeField",
     "ConditionStatus",
     "ConditionType",
+    "DailyIntake",
     "Disease",
     "DiseaseFoodRule",
     "FallbackStatus",
@@ -4,7 +4,7 @@ AI 对话数据模型
 
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, DateTime, Text, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import String, DateTime, Text, ForeignKey, Enum as SQLEnum, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 import enum
@@ -23,6 +23,9 @@ class ChatSession(Base):
     """对话会话表"""
     
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        Index("ix_chat_sessions_user_id_updated_at_id", "user_id", "updated_at", "id"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
@@ -53,6 +56,7 @@ class ChatSession(Base):
         "ChatMessage",
         back_populates="session",
         cascade="all, delete-orphan",
+        passive_deletes=True,
         order_by="ChatMessage.created_at"
     )
 
@@ -61,6 +65,9 @@ class ChatMessage(Base):
     """对话消息表"""
     
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_session_id_created_at", "session_id", "created_at"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
@@ -77,6 +84,8 @@ class ChatMessage(Base):
             MessageRole,
             name="messagerole",
             values_callable=lambda enum_cls: [item.value for item in enum_cls],
+            native_enum=False,
+            length=16,
         ),
         nullable=False,
     )
@@ -4,7 +4,7 @@
 
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, DateTime, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import String, DateTime, Text, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 import enum
@@ -37,6 +37,12 @@ class HealthCondition(Base):
     """健康状况表"""
     
     __tablename__ = "health_conditions"
+    # flush 时通过 RETURNING 取回 created_at/updated_at 等服务端生成值，无需再 refresh
+    __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        Index("ix_health_conditions_user_id_condition_type", "user_id", "condition_type"),
+        Index("ix_health_conditions_user_id_condition_code", "user_id", "condition_code"),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
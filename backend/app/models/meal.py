@@ -4,7 +4,7 @@
 
 from datetime import datetime, date
 from typing import Optional
-from sqlalchemy import String, Float, Integer, DateTime, Date, Text, ForeignKey, Enum as SQLEnum, JSON, UniqueConstraint
+from sqlalchemy import String, Float, Integer, DateTime, Date, Text, ForeignKey, Enum as SQLEnum, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 import enum
@@ -48,8 +48,12 @@ class Meal(Base):
     """饮食记录表"""
     
     __tablename__ = "meals"
+    # flush 时通过 RETURNING 取回 created_at/updated_at 等服务端生成值，无需再 refresh
+    __mapper_args__ = {"eager_defaults": True}
     __table_args__ = (
         UniqueConstraint("user_id", "client_id", name="uq_meals_user_client_id"),
+        # 覆盖按日期查询与列表的 (record_date, created_at, id) 游标分页
+        Index("ix_meals_user_id_record_date_created_at_id", "user_id", "record_date", "created_at", "id"),
     )
     
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -77,9 +81,15 @@ class Meal(Base):
     fat: Mapped[Optional[float]] = mapped_column(Float, nullable=True)       # 脂肪 g
     fiber: Mapped[Optional[float]] = mapped_column(Float, nullable=True)     # 膳食纤维 g
     
-    # 分类
-    meal_type: Mapped[MealType] = mapped_column(SQLEnum(MealType), nullable=False)
-    category: Mapped[FoodCategory] = mapped_column(SQLEnum(FoodCategory), nullable=False)
+    # 分类（以 VARCHAR 存储枚举名，不使用 PG 原生枚举类型）
+    meal_type: Mapped[MealType] = mapped_column(
+        SQLEnum(MealType, native_enum=False, length=16),
+        nullable=False
+    )
+    category: Mapped[FoodCategory] = mapped_column(
+        SQLEnum(FoodCategory, native_enum=False, length=16),
+        nullable=False
+    )
     
     # 记录日期
     record_date: Mapped[date] = mapped_column(Date, index=True, nullable=False)
@@ -101,7 +111,7 @@ class Meal(Base):
     
     # 同步状态
     sync_status: Mapped[SyncStatus] = mapped_column(
-        SQLEnum(SyncStatus),
+        SQLEnum(SyncStatus, native_enum=False, length=16),
         default=SyncStatus.SYNCED
     )
     
@@ -120,4 +130,28 @@ class Meal(Base):
     user: Mapped["User"] = relationship("User", back_populates="meals")
 
 
+class DailyIntake(Base):
+    """
+    每日摄入汇总表
+
+    随饮食记录的增删改在同一事务内累加维护，读取当日汇总只需按主键取一行。
+    """
+    
+    __tablename__ = "daily_intake"
+    
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    record_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    
+    calories: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    sodium: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    purine: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    protein: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    carbs: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    fat: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    meal_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
 from app.models.user import User
@@ -4,7 +4,7 @@
 
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import String, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 import enum
@@ -23,6 +23,10 @@ class AppMessage(Base):
     """应用消息表"""
     
     __tablename__ = "app_messages"
+    __table_args__ = (
+        # 未读消息部分索引，服务未读列表与未读计数
+        Index("ix_app_messages_user_id_unread", "user_id", postgresql_where=text("is_read = false")),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
@@ -34,7 +38,11 @@ class AppMessage(Base):
     )
     
     # 消息内容
-    message_type: Mapped[MessageType] = mapped_column(SQLEnum(MessageType), nullable=False)
+    # 以 VARCHAR 存储枚举名，不使用 PG 原生枚举类型
+    message_type: Mapped[MessageType] = mapped_column(
+        SQLEnum(MessageType, native_enum=False, length=16),
+        nullable=False
+    )
     title: Mapped[str] = mapped_column(String(100), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     attribution: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # 归因说明
@@ -22,6 +22,8 @@ class User(Base):
     """用户表"""
     
     __tablename__ = "users"
+    # flush 时通过 RETURNING 取回 created_at/updated_at 等服务端生成值，无需再 refresh
+    __mapper_args__ = {"eager_defaults": True}
     
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
@@ -59,25 +61,31 @@ class User(Base):
     )
     
     # 关系
+    # 各请求都按需显式查询关联记录，不经由关系属性访问；删除用户时由数据库外键级联删除，
+    # 不预先加载子记录
     meals: Mapped[list["Meal"]] = relationship(
         "Meal",
         back_populates="user",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     conditions: Mapped[list["HealthCondition"]] = relationship(
         "HealthCondition",
         back_populates="user",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     messages: Mapped[list["AppMessage"]] = relationship(
         "AppMessage",
         back_populates="user",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     chat_sessions: Mapped[list["ChatSession"]] = relationship(
         "ChatSession",
         back_populates="user",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     knowledge_audit_logs: Mapped[list["KnowledgeAuditLog"]] = relationship(
         "KnowledgeAuditLog",
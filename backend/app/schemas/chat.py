@@ -4,7 +4,7 @@ AI 对话相关 Pydantic Schema
 
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from app.models.chat import MessageRole
 
@@ -41,8 +41,7 @@ class ChatMessageResponse(BaseModel):
     tokens_used: Optional[int] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class ChatSessionResponse(BaseModel):
@@ -53,8 +52,7 @@ class ChatSessionResponse(BaseModel):
     updated_at: datetime
     message_count: int = 0
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ChatSessionDetailResponse(BaseModel):
@@ -65,8 +63,7 @@ class ChatSessionDetailResponse(BaseModel):
     updated_at: datetime
     messages: List[ChatMessageResponse]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class NutritionInfo(BaseModel):
@@ -79,6 +76,8 @@ class NutritionInfo(BaseModel):
     fat: Optional[float] = Field(None, description="脂肪(g)")
     fiber: Optional[float] = Field(None, description="膳食纤维(g)")
     sugar: Optional[float] = Field(None, description="糖(g)")
+    
+    model_config = ConfigDict(frozen=True)
 
 
 class FoodRecognitionResult(BaseModel):
@@ -95,6 +94,8 @@ class FoodRecognitionResult(BaseModel):
     risk_tags: List[str] = Field(default_factory=list, description="风险标签")
     health_tips: Optional[str] = Field(None, description="健康提示")
     warnings: List[str] = Field(default_factory=list, description="针对用户健康状况的警告")
+    
+    model_config = ConfigDict(frozen=True)
 
 
 class FoodRecognitionResponse(BaseModel):
@@ -18,10 +18,11 @@ class ResponseBase(BaseModel, Generic[T]):
 class PaginatedResponse(BaseModel, Generic[T]):
     """分页响应"""
     items: List[T]
-    total: int = Field(description="总数量")
+    total: Optional[int] = Field(description="总数量，游标分页时不统计")
     page: int = Field(description="当前页码")
     page_size: int = Field(description="每页数量")
-    total_pages: int = Field(description="总页数")
+    total_pages: Optional[int] = Field(description="总页数，游标分页时不统计")
+    next_cursor: Optional[str] = Field(None, description="下一页游标，没有更多数据时为空")
 
 
 class ErrorResponse(BaseModel):
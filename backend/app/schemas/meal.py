@@ -4,7 +4,7 @@
 
 from datetime import datetime, date
 from typing import Optional, List, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 from app.models.meal import MealType, FoodCategory, SyncStatus
 
@@ -95,8 +95,11 @@ class MealResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+# 饮食记录列表的校验器，模块加载时构建一次，供各接口批量校验 ORM 记录
+MEAL_LIST_ADAPTER = TypeAdapter(List[MealResponse])
 
 
 class DailyIntakeSummary(BaseModel):
@@ -4,12 +4,16 @@
 
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 import re
 
 from app.models.user import Gender
 
 
+# 大陆手机号：1 开头、第二位 3-9，共 11 位 ASCII 数字
+_PHONE_RE = re.compile(r"1[3-9][0-9]{9}")
+
+
 # ==================== 请求 Schema ====================
 
 class UserRegister(BaseModel):
@@ -21,7 +25,7 @@ class UserRegister(BaseModel):
     @field_validator("phone")
     @classmethod
     def validate_phone(cls, v: str) -> str:
-        if not re.match(r"^1[3-9]\d{9}$", v):
+        if not _PHONE_RE.fullmatch(v):
             raise ValueError("手机号格式不正确")
         return v
 
@@ -61,7 +65,7 @@ class SendCodeRequest(BaseModel):
     @field_validator("phone")
     @classmethod
     def validate_code_phone(cls, v: str) -> str:
-        if not re.match(r"^1[3-9]\d{9}$", v):
+        if not _PHONE_RE.fullmatch(v):
             raise ValueError("手机号格式不正确")
         return v
 
@@ -74,7 +78,7 @@ class CodeLoginRequest(BaseModel):
     @field_validator("phone")
     @classmethod
     def validate_login_code_phone(cls, v: str) -> str:
-        if not re.match(r"^1[3-9]\d{9}$", v):
+        if not _PHONE_RE.fullmatch(v):
             raise ValueError("手机号格式不正确")
         return v
 
@@ -88,7 +92,7 @@ class ResetPasswordRequest(BaseModel):
     @field_validator("phone")
     @classmethod
     def validate_reset_phone(cls, v: str) -> str:
-        if not re.match(r"^1[3-9]\d{9}$", v):
+        if not _PHONE_RE.fullmatch(v):
             raise ValueError("手机号格式不正确")
         return v
 
@@ -109,8 +113,7 @@ class UserResponse(BaseModel):
     is_verified: bool
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CalorieRange(BaseModel):
@@ -3,21 +3,74 @@
 统一主多模态模型调用，支持文本、图片和图文混合输入
 """
 
-import json
-import asyncio
+import base64
+import functools
 import logging
+import re
 import time
 from typing import Optional, List, Dict, Any, AsyncGenerator, Union
 
+import orjson
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, model_validator
+
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.models.user import User
-from app.models.health_condition import HealthCondition
+from app.models.health_condition import ConditionType, HealthCondition
 from app.schemas.chat import NutritionInfo, FoodRecognitionResult
 from app.services.target_service import calculate_bmi, calculate_daily_targets
 
 logger = logging.getLogger(__name__)
 
 
+# ═══════════════════════════════════════════════════════════
+# 食物识别结果解析：模型输出的 JSON 由 pydantic-core 一次完成解析与校验
+# ═══════════════════════════════════════════════════════════
+
+# Markdown 代码块：一次匹配取出围栏内的内容
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+_NUTRITION_KEYS = ("calories", "sodium", "purine", "protein", "carbs", "fat", "fiber", "sugar")
+
+
+class _RecognizedNutrition(NutritionInfo):
+    """模型输出的营养成分，热量/钠/嘌呤缺省为 0"""
+    calories: float = 0
+    sodium: float = 0
+    purine: float = 0
+
+
+class _RecognizedFood(FoodRecognitionResult):
+    """模型输出的单个食物，缺失字段按约定补默认值"""
+    food_name: str = "未命名食物"
+    confidence: float = 0.8
+    estimated_portion: str = "1份"
+    nutrition: _RecognizedNutrition = Field(default_factory=_RecognizedNutrition)
+    category: str = "STAPLE"
+
+    @model_validator(mode="before")
+    @classmethod
+    def _fill_fallbacks(cls, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        # 营养成分可能直接平铺在食物对象上
+        if not data.get("nutrition"):
+            data["nutrition"] = {key: data[key] for key in _NUTRITION_KEYS if key in data}
+        portion = data.get("estimated_portion") or data.get("amount_text") or "1份"
+        data["estimated_portion"] = portion
+        data["amount_text"] = data.get("amount_text") or portion
+        return data
+
+
+class _RecognitionPayload(BaseModel):
+    foods: List[_RecognizedFood] = Field(default_factory=list)
+    ai_response: str = "识别完成，请查看营养分析。"
+
+
+_RECOGNITION_ADAPTER = TypeAdapter(_RecognitionPayload)
+
+
 # ═══════════════════════════════════════════════════════════
 # 食鉴AI · 系统提示词工程 v2.0
 # ═══════════════════════════════════════════════════════════
@@ -256,42 +309,72 @@ THEN 判定风险等级，并解释冲突原因
 """
 
 
-class DoubaoAIService:
-    """豆包 AI 服务"""
+# 用户健康上下文缓存：以构建上下文用到的全部字段为键，
+# 资料或健康状况变化后键随之变化，无需显式失效
+_USER_CONTEXT_CACHE: TTLCache[tuple, str] = TTLCache(maxsize=4096, ttl=3600.0)
 
-    def __init__(self):
-        self.client = None
-        self._initialized = False
-        self._lock = asyncio.Lock()
 
-    async def _ensure_initialized(self):
-        """确保 SDK 已初始化"""
-        if self._initialized:
-            return
+def _user_context_key(user: User, conditions: List[HealthCondition]) -> tuple:
+    return (
+        user.gender,
+        user.age,
+        user.height,
+        user.weight,
+        tuple(
+            (c.condition_type, c.status, c.condition_code, c.title, c.value, c.unit)
+            for c in conditions
+        ),
+    )
 
-        async with self._lock:
-            if self._initialized:
-                return
 
-            if not settings.ark_api_key:
-                raise RuntimeError("豆包 API 密钥未配置，请设置 ARK_API_KEY 环境变量")
+# 用户上下文中的性别与慢病状态文案
+_GENDER_LABELS = {"MALE": "男", "FEMALE": "女"}
+_CONDITION_STATUS_LABELS = {
+    "ACTIVE": "活跃期",
+    "MONITORING": "监测中",
+    "STABLE": "稳定期",
+}
 
-            try:
-                from volcenginesdkarkruntime import Ark
-                import httpx
-
-                timeout = httpx.Timeout(
-                    timeout=settings.doubao_timeout_seconds,
-                    connect=settings.doubao_connect_timeout_seconds,
-                )
-                self.client = Ark(
-                    api_key=settings.ark_api_key,
-                    timeout=timeout,
-                    max_retries=settings.doubao_max_retries,
-                )
-                self._initialized = True
-            except ImportError:
-                raise RuntimeError("请安装 volcengine-python-sdk[ark]")
+# 系统提示词在占位符处预先切分，填入上下文只需拼接，不再逐次解析模板
+_SYSTEM_PROMPT_PREFIX, _SYSTEM_PROMPT_SUFFIX = SYSTEM_PROMPT.split("{user_context}")
+
+
+@functools.lru_cache(maxsize=1024)
+def _system_prompt(user_context: str) -> str:
+    """填入用户上下文的系统提示词，相同上下文复用同一字符串"""
+    return _SYSTEM_PROMPT_PREFIX + user_context + _SYSTEM_PROMPT_SUFFIX
+
+
+@functools.cache
+def _get_client():
+    """
+    豆包 SDK 异步客户端，首次调用时创建，之后进程内复用
+
+    未配置密钥或未安装 SDK 时抛出 RuntimeError，且不缓存失败结果。
+    """
+    if not settings.ark_api_key:
+        raise RuntimeError("豆包 API 密钥未配置，请设置 ARK_API_KEY 环境变量")
+
+    try:
+        from volcenginesdkarkruntime import AsyncArk
+        import httpx
+    except ImportError:
+        raise RuntimeError("请安装 volcengine-python-sdk[ark]")
+
+    timeout = httpx.Timeout(
+        timeout=settings.doubao_timeout_seconds,
+        connect=settings.doubao_connect_timeout_seconds,
+    )
+    # 异步客户端：等待模型响应期间不占用线程池，也不阻塞事件循环
+    return AsyncArk(
+        api_key=settings.ark_api_key,
+        timeout=timeout,
+        max_retries=settings.doubao_max_retries,
+    )
+
+
+class DoubaoAIService:
+    """豆包 AI 服务"""
 
     @staticmethod
     def _enum_value(value: Any) -> Any:
@@ -325,7 +408,13 @@ class DoubaoAIService:
             return cleaned
         return f"data:image/{cls._normalize_image_type(image_type)};base64,{cleaned}"
 
-    def _create_chat_completion(
+    @classmethod
+    def image_bytes_data_url(cls, image_bytes: bytes, image_type: Optional[str] = None) -> str:
+        """由图片原始字节直接生成 data URL，只做一次 base64 编码与一次解码"""
+        prefix = f"data:image/{cls._normalize_image_type(image_type)};base64,".encode("ascii")
+        return (prefix + base64.b64encode(image_bytes)).decode("ascii")
+
+    async def _create_chat_completion(
         self,
         *,
         messages: List[Dict[str, Any]],
@@ -334,7 +423,7 @@ class DoubaoAIService:
         stream: bool = False,
     ):
         """Create a chat completion through the single main multimodal model."""
-        return self.client.chat.completions.create(
+        return await _get_client().chat.completions.create(
             model=settings.main_doubao_model,
             messages=messages,
             temperature=temperature,
@@ -351,11 +440,10 @@ class DoubaoAIService:
         metrics: Optional[dict[str, Any]] = None,
     ) -> str:
         """Generate text with the main multimodal model."""
-        await self._ensure_initialized()
+        _get_client()
         start = time.perf_counter()
         try:
-            response = await asyncio.to_thread(
-                self._create_chat_completion,
+            response = await self._create_chat_completion(
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
@@ -385,14 +473,13 @@ class DoubaoAIService:
         max_tokens: int = 2000,
     ) -> str:
         """Generate text from image or mixed text-image input through the main model."""
-        await self._ensure_initialized()
+        _get_client()
         if not image_base64 and not image_url:
             raise ValueError("image_base64 或 image_url 至少需要提供一个")
 
         image_payload_url = image_url or self._image_data_url(image_base64 or "", image_type)
         try:
-            response = await asyncio.to_thread(
-                self._create_chat_completion,
+            response = await self._create_chat_completion(
                 messages=[
                     {
                         "role": "user",
@@ -421,12 +508,24 @@ class DoubaoAIService:
         user: User,
         conditions: List[HealthCondition]
     ) -> str:
-        """构建用户健康上下文（供 AI 参考）"""
+        """构建用户健康上下文（供 AI 参考），结果按资料与健康状况缓存"""
+        key = _user_context_key(user, conditions)
+        user_context = _USER_CONTEXT_CACHE.get(key)
+        if user_context is None:
+            user_context = self._render_user_context(user, conditions)
+            _USER_CONTEXT_CACHE.set(key, user_context)
+        return user_context
+
+    def _render_user_context(
+        self,
+        user: User,
+        conditions: List[HealthCondition]
+    ) -> str:
         context_parts = []
 
         # 基本信息 + 每日目标。目标计算统一由 target_service 提供。
         if user.gender and user.age and user.height and user.weight:
-            gender_str = "男" if self._enum_value(user.gender) == "MALE" else "女"
+            gender_str = _GENDER_LABELS.get(self._enum_value(user.gender), "女")
             bmi = calculate_bmi(user)
             targets = calculate_daily_targets(user, conditions)
 
@@ -439,27 +538,28 @@ class DoubaoAIService:
                 f"- 推荐摄入目标：热量 {targets.recommended_calorie_target}kcal，钠 <{targets.sodium}mg，嘌呤 <{targets.purine}mg"
             )
 
+        # 一次遍历拆分慢性病与过敏源；ConditionType 为 str 枚举，原始字符串同样可以比较
+        chronic_conditions: List[HealthCondition] = []
+        allergy_titles: List[str] = []
+        for c in conditions:
+            if c.condition_type == ConditionType.CHRONIC:
+                chronic_conditions.append(c)
+            elif c.condition_type == ConditionType.ALLERGY:
+                allergy_titles.append(f"**{c.title}**")
+
         # 慢性病（含状态和具体指标）
-        chronic_conditions = [
-            c for c in conditions if self._enum_value(c.condition_type) == "CHRONIC"
-        ]
         if chronic_conditions:
             context_parts.append("- 慢性病史：")
             for c in chronic_conditions:
-                status_str = {
-                    "ACTIVE": "活跃期",
-                    "MONITORING": "监测中",
-                    "STABLE": "稳定期",
-                }.get(self._enum_value(c.status) if c.status else "", "未知")
+                status_str = _CONDITION_STATUS_LABELS.get(self._enum_value(c.status), "未知")
                 detail = f"  · {c.title}（{status_str}）"
                 if c.value and c.unit:
                     detail += f" — 最近值：{c.value}{c.unit}"
                 context_parts.append(detail)
 
         # 过敏源（高优先级警告）
-        allergies = [c for c in conditions if self._enum_value(c.condition_type) == "ALLERGY"]
-        if allergies:
-            allergy_str = "、".join([f"**{c.title}**" for c in allergies])
+        if allergy_titles:
+            allergy_str = "、".join(allergy_titles)
             context_parts.append(f"- 🚫 过敏源（绝对禁止）：{allergy_str}")
 
         if not context_parts:
@@ -529,11 +629,11 @@ class DoubaoAIService:
         Returns:
             AI 回复内容
         """
-        await self._ensure_initialized()
+        _get_client()
 
         prompt_start = time.perf_counter()
         user_context = self._build_user_context(user, conditions)
-        prompt = SYSTEM_PROMPT.format(user_context=user_context)
+        prompt = _system_prompt(user_context)
         if local_guardrail:
             prompt = (
                 f"{prompt}\n\n"
@@ -581,26 +681,25 @@ class DoubaoAIService:
         response_chars = 0
         first_chunk_seen = False
         try:
-            stream = await asyncio.to_thread(
-                self._create_chat_completion,
+            stream = await self._create_chat_completion(
                 messages=messages,
                 temperature=0.7,
                 max_tokens=settings.doubao_chat_max_tokens,
                 stream=True
             )
 
-            while True:
-                content = await asyncio.to_thread(self._next_stream_content, stream)
-                if content is None:
-                    break
-                if not content:
-                    continue
-                response_chars += len(content)
-                if content and not first_chunk_seen:
-                    first_chunk_seen = True
-                    if metrics is not None:
-                        metrics["doubao_first_chunk_ms"] = round((time.perf_counter() - start) * 1000, 2)
-                yield content
+            # 客户端断开导致生成器提前关闭时，async with 负责关闭上游连接
+            async with stream:
+                async for chunk in stream:
+                    content = self._chunk_content(chunk)
+                    if not content:
+                        continue
+                    response_chars += len(content)
+                    if not first_chunk_seen:
+                        first_chunk_seen = True
+                        if metrics is not None:
+                            metrics["doubao_first_chunk_ms"] = round((time.perf_counter() - start) * 1000, 2)
+                    yield content
             if metrics is not None:
                 metrics.setdefault("doubao_first_chunk_ms", None)
                 metrics["doubao_total_ms"] = round((time.perf_counter() - start) * 1000, 2)
@@ -615,42 +714,38 @@ class DoubaoAIService:
             raise RuntimeError(self._format_cloud_error(e)) from e
 
     @staticmethod
-    def _next_stream_content(stream) -> Optional[str]:
-        try:
-            chunk = next(stream)
-        except StopIteration:
-            return None
+    def _chunk_content(chunk) -> str:
         if chunk.choices and chunk.choices[0].delta.content:
             return chunk.choices[0].delta.content
         return ""
 
     @staticmethod
-    def _extract_json_object(content: str) -> Dict[str, Any]:
-        """Parse a JSON object from plain text or a markdown fenced block."""
-        raw = content.strip()
-        if "```json" in raw:
-            raw = raw.split("```json", 1)[1].split("```", 1)[0]
-        elif "```" in raw:
-            raw = raw.split("```", 1)[1].split("```", 1)[0]
+    def _extract_json_text(content: str) -> str:
+        """Return the JSON object text from plain text or a markdown fenced block."""
+        match = _FENCE_RE.search(content)
+        raw = match.group(1) if match else content.strip()
+        # 去掉对象前后的说明文字
+        start = raw.find("{")
+        end = raw.rfind("}")
+        if start >= 0 and end > start:
+            return raw[start : end + 1]
+        return raw
 
-        raw = raw.strip()
-        try:
-            return json.loads(raw)
-        except json.JSONDecodeError:
-            start = raw.find("{")
-            end = raw.rfind("}")
-            if start >= 0 and end > start:
-                return json.loads(raw[start : end + 1])
-            raise
+    @classmethod
+    def _extract_json_object(cls, content: str) -> Dict[str, Any]:
+        """Parse a JSON object from plain text or a markdown fenced block."""
+        return orjson.loads(cls._extract_json_text(content))
 
     async def recognize_food(
         self,
-        image_base64: str,
+        image_base64: Optional[str] = None,
+        *,
         user: User,
         conditions: List[HealthCondition],
         image_type: str = "jpeg",
         user_prompt: Optional[str] = None,
         fast: bool = False,
+        image_url: Optional[str] = None,
     ) -> tuple[List[FoodRecognitionResult], str]:
         """
         识别食物图片
@@ -658,18 +753,19 @@ class DoubaoAIService:
         Args:
             image_base64: Base64 编码的图片
             image_type: 图片类型，如 jpeg/png/webp
+            image_url: 图片 URL 或已生成的 data URL，提供时忽略 image_base64
             user: 当前用户
             conditions: 用户健康状况
 
         Returns:
             (识别结果列表, AI 对话式回复)
         """
-        await self._ensure_initialized()
+        _get_client()
 
         user_context = self._build_user_context(user, conditions)
 
         # 获取过敏源列表用于警告
-        allergies = [c.title for c in conditions if self._enum_value(c.condition_type) == "ALLERGY"]
+        allergies = [c.title for c in conditions if c.condition_type == ConditionType.ALLERGY]
         allergy_warning = f"用户对以下食物过敏：{', '.join(allergies)}" if allergies else ""
         user_prompt_block = (user_prompt or "").strip()
         user_prompt_section = f"\n用户随图片补充的提示词：{user_prompt_block}\n请优先结合这段提示词理解图片，例如食材名称、份量、烹饪方式、用户想重点分析的问题。" if user_prompt_block else ""
@@ -756,54 +852,21 @@ JSON 格式：
                 prompt=recognition_prompt,
                 image_base64=image_base64,
                 image_type=image_type,
+                image_url=image_url,
                 temperature=0.2 if fast else 0.3,
                 max_tokens=settings.doubao_vision_fast_max_tokens if fast else settings.doubao_vision_max_tokens,
             )
 
-            # 尝试解析 JSON
+            # 解析并校验 JSON
             try:
-                result = self._extract_json_object(content)
-
-                foods = []
-                for f in result.get("foods", []):
-                    nutrition_payload = f.get("nutrition") or {
-                        "calories": f.get("calories", 0),
-                        "sodium": f.get("sodium", 0),
-                        "purine": f.get("purine", 0),
-                        "protein": f.get("protein"),
-                        "carbs": f.get("carbs"),
-                        "fat": f.get("fat"),
-                        "fiber": f.get("fiber"),
-                        "sugar": f.get("sugar"),
-                    }
-                    nutrition_payload.setdefault("calories", 0)
-                    nutrition_payload.setdefault("sodium", 0)
-                    nutrition_payload.setdefault("purine", 0)
-                    portion = f.get("estimated_portion") or f.get("amount_text") or "1份"
-                    foods.append(
-                        FoodRecognitionResult(
-                            food_name=f.get("food_name", "未命名食物"),
-                            confidence=f.get("confidence", 0.8),
-                            estimated_portion=portion,
-                            amount_text=f.get("amount_text") or portion,
-                            ingredients=f.get("ingredients", []),
-                            cooking_method=f.get("cooking_method"),
-                            nutrition=NutritionInfo(**nutrition_payload),
-                            category=f.get("category", "STAPLE"),
-                            allergen_tags=f.get("allergen_tags", []),
-                            risk_tags=f.get("risk_tags", []),
-                            health_tips=f.get("health_tips"),
-                            warnings=f.get("warnings", [])
-                        )
-                    )
-
-                ai_response = result.get("ai_response", "识别完成，请查看营养分析。")
-
-                return foods, ai_response
-
-            except json.JSONDecodeError:
-                # JSON 解析失败，返回原始文本
-                return [], content
+                payload = _RECOGNITION_ADAPTER.validate_json(self._extract_json_text(content))
+            except ValidationError as exc:
+                if exc.errors()[0]["type"] == "json_invalid":
+                    # JSON 解析失败，返回原始文本
+                    return [], content
+                raise
+
+            return list(payload.foods), payload.ai_response
 
         except Exception as e:
             logger.exception("Doubao food recognition request failed")
@@ -0,0 +1,134 @@
+"""
+每日摄入汇总：汇总表维护与进程内缓存
+
+饮食记录增删改时调用 adjust_daily_intake，在同一事务内把营养值增量累加到
+daily_intake 表，读取汇总只需按主键取一行。
+
+汇总另按 (user_id, 日期) 缓存。记录变更时立即删除对应日期的缓存，
+并在事务提交后再删除一次，避免提交前的并发读取把旧值写回缓存。
+"""
+
+from collections.abc import Iterable
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.database import WriteTrackingSession
+from app.models.meal import DailyIntake, Meal
+from app.schemas.meal import DailyIntakeSummary
+
+
+# 历史日期的汇总基本不再变化，最长缓存 30 天
+_SUMMARY_CACHE: TTLCache[tuple[int, date], DailyIntakeSummary] = TTLCache(
+    maxsize=4096,
+    ttl=30 * 86400.0,
+)
+
+# 当天及以后日期的缓存在当天结束后再保留一小段时间
+_TODAY_GRACE_SECONDS = 60.0
+
+# 会话 info 中记录待提交后失效的缓存键
+_PENDING_KEY = "pending_summary_invalidations"
+
+# 汇总表中按增量累加的营养字段
+_NUTRIENT_FIELDS = ("calories", "sodium", "purine", "protein", "carbs", "fat")
+
+
+def _summary_ttl(target_date: date) -> float:
+    """历史日期使用缓存默认有效期，当天及以后日期缓存到今天结束"""
+    today = date.today()
+    if target_date < today:
+        return _SUMMARY_CACHE.ttl
+    end_of_day = datetime.combine(today + timedelta(days=1), time.min)
+    return (end_of_day - datetime.now()).total_seconds() + _TODAY_GRACE_SECONDS
+
+
+async def load_daily_summary(db: AsyncSession, user_id: int, target_date: date) -> DailyIntakeSummary:
+    """获取某日摄入汇总，优先读取缓存"""
+    key = (user_id, target_date)
+    summary = _SUMMARY_CACHE.get(key)
+    if summary is not None:
+        return summary
+
+    intake = await db.get(DailyIntake, (user_id, target_date))
+    if intake is None:
+        summary = DailyIntakeSummary(
+            date=target_date,
+            total_calories=0,
+            total_sodium=0,
+            total_purine=0,
+            total_protein=0,
+            total_carbs=0,
+            total_fat=0,
+            meal_count=0
+        )
+    else:
+        summary = DailyIntakeSummary(
+            date=target_date,
+            total_calories=intake.calories,
+            total_sodium=intake.sodium,
+            total_purine=intake.purine,
+            total_protein=intake.protein,
+            total_carbs=intake.carbs,
+            total_fat=intake.fat,
+            meal_count=intake.meal_count
+        )
+    _SUMMARY_CACHE.set(key, summary, _summary_ttl(target_date))
+    return summary
+
+
+async def adjust_daily_intake(db: AsyncSession, meals: Iterable[Meal], sign: int = 1) -> None:
+    """
+    把饮食记录的营养值累加到汇总表（sign=-1 时扣减）
+
+    新增记录在 flush 后以 sign=1 调用；删除记录及修改前的旧值以 sign=-1 调用。
+    同一 (user_id, 日期) 的增量先在内存中合并，再用一条 INSERT ... ON CONFLICT 写入。
+    """
+    deltas: dict[tuple[int, date], dict[str, float]] = {}
+    for meal in meals:
+        delta = deltas.get((meal.user_id, meal.record_date))
+        if delta is None:
+            delta = dict.fromkeys(_NUTRIENT_FIELDS, 0.0)
+            delta["meal_count"] = 0
+            deltas[(meal.user_id, meal.record_date)] = delta
+        for field in _NUTRIENT_FIELDS:
+            delta[field] += sign * (getattr(meal, field) or 0)
+        delta["meal_count"] += sign
+    if not deltas:
+        return
+
+    stmt = pg_insert(DailyIntake).values([
+        {"user_id": user_id, "record_date": record_date, **delta}
+        for (user_id, record_date), delta in deltas.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyIntake.user_id, DailyIntake.record_date],
+        set_={
+            field: getattr(DailyIntake, field) + getattr(stmt.excluded, field)
+            for field in (*_NUTRIENT_FIELDS, "meal_count")
+        }
+    )
+    await db.execute(stmt)
+
+    for user_id, record_date in deltas:
+        invalidate_daily_summary(db, user_id, record_date)
+
+
+def invalidate_daily_summary(db: AsyncSession, user_id: int, *record_dates: date) -> None:
+    """使对应日期的汇总缓存失效，汇总表更新后由 adjust_daily_intake 调用"""
+    pending = db.info.setdefault(_PENDING_KEY, set())
+    for record_date in record_dates:
+        key = (user_id, record_date)
+        _SUMMARY_CACHE.pop(key)
+        pending.add(key)
+
+
+@event.listens_for(WriteTrackingSession, "after_commit")
+@event.listens_for(WriteTrackingSession, "after_rollback")
+def _pop_pending_invalidations(session: Session) -> None:
+    for key in session.info.pop(_PENDING_KEY, ()):
+        _SUMMARY_CACHE.pop(key)
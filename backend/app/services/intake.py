@@ -25,7 +25,8 @@ from app.schemas.intake import (
     VoiceAutoLogRequest,
     VoiceParseRequest,
 )
-from app.schemas.meal import MealResponse
+from app.schemas.meal import MEAL_LIST_ADAPTER
+from app.services.daily_summary import adjust_daily_intake
 from app.services.knowledge import KnowledgeService, write_knowledge_audit_log
 from app.services.knowledge.contracts import LocalDecision, NormalizedConditions
 
@@ -399,8 +400,7 @@ class IntakeService:
 
         if meals:
             await db.flush()
-            for meal in meals:
-                await db.refresh(meal)
+            await adjust_daily_intake(db, meals)
 
         await self._write_parse_audit(
             db,
@@ -411,7 +411,7 @@ class IntakeService:
         )
 
         return IntakeConfirmResponse(
-            meals=[MealResponse.model_validate(meal) for meal in meals],
+            meals=MEAL_LIST_ADAPTER.validate_python(meals, from_attributes=True),
             meal_ids=[meal.id for meal in meals],
             warning_summary=self._unique(warnings_summary),
             failed_items=failures,
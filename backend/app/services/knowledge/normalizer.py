@@ -41,11 +41,17 @@ def _normalize_text(value: Optional[str]) -> str:
     return "".join(str(value).strip().lower().split())
 
 
+# Aliases are normalized once at import instead of on every match.
+_NORMALIZED_DEFAULT_ALIASES: tuple[tuple[str, tuple[str, ...]], ...] = tuple(
+    (disease_code, tuple(_normalize_text(alias) for alias in aliases))
+    for disease_code, aliases in DEFAULT_ALIASES.items()
+)
+
+
 def match_default_disease_code(condition_code: Optional[str], title: Optional[str] = None) -> Optional[str]:
     normalized_title = _normalize_text(title)
     normalized_code = _normalize_text(condition_code)
-    for disease_code, aliases in DEFAULT_ALIASES.items():
-        normalized_aliases = [_normalize_text(alias) for alias in aliases]
+    for disease_code, normalized_aliases in _NORMALIZED_DEFAULT_ALIASES:
         if normalized_code and normalized_code in normalized_aliases:
             return disease_code
         if normalized_title and normalized_title in normalized_aliases:
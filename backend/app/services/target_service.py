@@ -18,6 +18,9 @@ SAFETY_CALORIE_FLOORS = {
     "UNKNOWN": 1300,
 }
 
+# Conditions in these states tighten the sodium / purine limits.
+_LIMITING_STATUSES = frozenset({ConditionStatus.ACTIVE, ConditionStatus.MONITORING, ConditionStatus.ALERT})
+
 DEFAULT_DAILY_TARGETS = DailyTargets(
     calories=0,
     sodium=2300,
@@ -116,7 +119,7 @@ def _recommended_target(user: User, bmi_category: Optional[str], estimated_tdee:
 def _condition_limits(conditions: Iterable[HealthCondition]) -> tuple[int, int]:
     active_codes = set()
     for condition in conditions:
-        if condition.status not in {ConditionStatus.ACTIVE, ConditionStatus.MONITORING, ConditionStatus.ALERT}:
+        if condition.status not in _LIMITING_STATUSES:
             continue
         active_codes.add(
             match_default_disease_code(condition.condition_code, condition.title) or condition.condition_code
@@ -136,9 +139,8 @@ def calculate_daily_targets(user: User, conditions: Iterable[HealthCondition]) -
     has_complete_profile = bool(user.gender and user.age and user.height and user.weight)
 
     if bmr is None or bmi_category is None:
-        return DailyTargets(
-            **{
-                **DEFAULT_DAILY_TARGETS.model_dump(),
+        return DEFAULT_DAILY_TARGETS.model_copy(
+            update={
                 "sodium": sodium_limit,
                 "purine": purine_limit,
                 "bmi": bmi,
@@ -0,0 +1,150 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.api import deps
+from app.core.security import create_access_token
+from app.models.user import User
+
+
+class FakeExecuteResult:
+    def __init__(self, user):
+        self.user = user
+
+    def scalar_one_or_none(self):
+        return self.user
+
+
+class FakeDb:
+    def __init__(self, user):
+        self.user = user
+        self.execute_calls = 0
+        self.expunged = []
+
+    async def execute(self, _query, _params=None):
+        self.execute_calls += 1
+        return FakeExecuteResult(self.user)
+
+    def expunge(self, item):
+        self.expunged.append(item)
+
+
+def request_with_authorization(value):
+    headers = [] if value is None else [(b"authorization", value.encode())]
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.fixture(autouse=True)
+def clear_auth_caches():
+    deps._AUTH_CACHE.clear()
+    deps._USER_CACHE.clear()
+    yield
+    deps._AUTH_CACHE.clear()
+    deps._USER_CACHE.clear()
+
+
+@pytest.mark.asyncio
+async def test_authenticate_skips_decode_for_cached_token(monkeypatch):
+    calls = []
+    real_decode = deps.decode_token
+
+    def counting_decode(token):
+        calls.append(token)
+        return real_decode(token)
+
+    monkeypatch.setattr(deps, "decode_token", counting_decode)
+    db = FakeDb(User(id=42, phone="13800138042", password_hash="x", is_active=True))
+    token = create_access_token(42)
+
+    await deps._authenticate(token, db)
+    deps.invalidate_cached_user(42)
+    user = await deps._authenticate(token, db)
+
+    assert user.id == 42
+    assert len(calls) == 1
+    assert db.execute_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_authenticate_does_not_cache_invalid_token(monkeypatch):
+    calls = []
+    monkeypatch.setattr(deps, "decode_token", lambda token: calls.append(token))
+    db = FakeDb(None)
+
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            await deps._authenticate("not-a-jwt", db)
+
+    assert len(calls) == 2
+    assert len(deps._AUTH_CACHE) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_serves_repeat_requests_from_cache():
+    user = User(id=7, phone="13800138007", password_hash="x", is_active=True)
+    db = FakeDb(user)
+    token = create_access_token(7)
+
+    first = await deps.get_current_user(request_with_authorization(None), token, db)
+    second = await deps.get_current_user(request_with_authorization(None), token, db)
+
+    assert first is user
+    assert second is user
+    assert db.execute_calls == 1
+    assert db.expunged == [user]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_cached_user_forces_reload():
+    db = FakeDb(User(id=8, phone="13800138008", password_hash="x", is_active=True))
+    token = create_access_token(8)
+
+    await deps.get_current_user(request_with_authorization(None), token, db)
+    deps.invalidate_cached_user(8)
+    await deps.get_current_user(request_with_authorization(None), token, db)
+
+    assert db.execute_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_reraises_cached_failure_within_request():
+    db = FakeDb(None)
+    request = request_with_authorization(None)
+    token = create_access_token(9)
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            await deps.get_current_user(request, token, db)
+        assert exc_info.value.status_code == 401
+
+    assert db.execute_calls == 1
+
+
+def test_bearer_token_parses_header_case_insensitively():
+    assert deps._bearer_token(request_with_authorization("Bearer abc")) == "abc"
+    assert deps._bearer_token(request_with_authorization("bearer abc")) == "abc"
+
+
+@pytest.mark.parametrize("value", [None, "", "Basic abc", "Bearer", "Bearer  "])
+def test_bearer_token_rejects_missing_or_malformed_header(value):
+    with pytest.raises(HTTPException) as exc_info:
+        deps._bearer_token(request_with_authorization(value))
+
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.headers == {"WWW-Authenticate": "Bearer"}
+
+
+def test_cursor_round_trips_sort_key():
+    cursor = deps.encode_cursor(datetime(2026, 10, 15, 8, 30), 42)
+
+    assert deps.decode_cursor(cursor, 2) == ["2026-10-15T08:30:00", 42]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", deps.encode_cursor(1, 2, 3)])
+def test_decode_cursor_rejects_malformed_cursor(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        deps.decode_cursor(cursor, 2)
+
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,29 @@
+from app.core import cache
+from app.core.cache import TTLCache
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    store = TTLCache(maxsize=8, ttl=10.0)
+
+    store.set("a", 1)
+    store.set("b", 2, ttl=2.0)
+    now[0] += 5
+
+    assert store.get("a") == 1
+    assert store.get("b") is None
+
+
+def test_ttl_cache_evicts_oldest_and_skips_non_positive_ttl():
+    store = TTLCache(maxsize=2, ttl=10.0)
+
+    store.set("a", 1)
+    store.set("b", 2)
+    store.set("c", 3)
+    store.set("d", 4, ttl=0)
+
+    assert store.get("a") is None
+    assert store.get("b") == 2
+    assert store.get("c") == 3
+    assert store.get("d") is None
@@ -4,7 +4,7 @@ from app.models.chat import ChatMessage, MessageRole
 from app.models.knowledge import RecommendationLevel
 from app.core.config import Settings
 from app.services.knowledge.severity import pick_strictest_recommendation_level
-from app.services.ai_service import DoubaoAIService
+from app.services.ai_service import DoubaoAIService, _RECOGNITION_ADAPTER
 
 
 def test_message_role_enum_uses_persisted_lowercase_values() -> None:
@@ -44,6 +44,18 @@ def test_extract_json_object_accepts_markdown_fence() -> None:
     assert payload == {"foods": []}
 
 
+def test_recognition_payload_fills_defaults_from_flat_fields() -> None:
+    text = DoubaoAIService._extract_json_text('结果如下：{"foods": [{"food_name": "米饭", "calories": 200, "amount_text": "1碗"}]}')
+    payload = _RECOGNITION_ADAPTER.validate_json(text)
+
+    food = payload.foods[0]
+    assert food.nutrition.calories == 200
+    assert food.nutrition.sodium == 0
+    assert food.estimated_portion == "1碗"
+    assert food.confidence == 0.8
+    assert payload.ai_response == "识别完成，请查看营养分析。"
+
+
 def test_pick_strictest_recommendation_level_handles_empty_levels() -> None:
     assert pick_strictest_recommendation_level([]) is None
     assert pick_strictest_recommendation_level([SimpleNamespace(recommendation_level=None)]) is None
@@ -1,7 +1,7 @@
 import pytest
 
 from app.api.routes import chat as chat_route
-from app.models.chat import ChatMessage, ChatSession, MessageRole
+from app.models.chat import ChatMessage, MessageRole
 from app.models.knowledge import FallbackStatus, KnowledgeOrigin, RecommendationLevel
 from app.models.user import User
 from app.schemas.chat import ChatMessageCreate
@@ -17,9 +17,13 @@ class FakeScalarResult:
 
 
 class FakeExecuteResult:
-    def __init__(self, *, scalar=None, items=None):
+    def __init__(self, *, scalar=None, items=None, rows=None):
         self.scalar = scalar
         self.items = items or []
+        self.rows = rows or []
+
+    def all(self):
+        return self.rows
 
     def scalar_one_or_none(self):
         return self.scalar
@@ -37,11 +41,13 @@ class FakeDb:
     async def execute(self, _query):
         self.execute_calls += 1
         if self.execute_calls == 1:
-            return FakeExecuteResult(scalar=ChatSession(id=1, user_id=1, title="test"))
+            # INSERT ... SELECT 写入用户消息，返回新消息 id
+            message_id = self.next_message_id
+            self.next_message_id += 1
+            return FakeExecuteResult(scalar=message_id)
         if self.execute_calls == 2:
-            return FakeExecuteResult(items=self.messages)
-        if self.execute_calls == 3:
-            return FakeExecuteResult(items=[])
+            # 历史消息与健康状况的 UNION ALL 查询
+            return FakeExecuteResult(rows=[])
         return FakeExecuteResult(items=[])
 
     def add(self, item):
@@ -0,0 +1,34 @@
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import StreamAwareGZipMiddleware
+
+
+def build_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(StreamAwareGZipMiddleware, minimum_size=16)
+
+    @app.get("/items")
+    async def items():
+        return PlainTextResponse("营养" * 200)
+
+    @app.get("/messages/stream")
+    async def stream():
+        return StreamingResponse(iter(["event: delta\ndata: {}\n\n"] * 20), media_type="text/event-stream")
+
+    return TestClient(app)
+
+
+def test_gzip_compresses_regular_responses():
+    response = build_client().get("/items", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == "营养" * 200
+
+
+def test_gzip_skips_event_stream_routes():
+    response = build_client().get("/messages/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text.count("event: delta") == 20
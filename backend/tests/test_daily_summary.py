@@ -0,0 +1,46 @@
+from datetime import date
+
+import pytest
+
+from app.models.meal import DailyIntake
+from app.services import daily_summary
+
+
+class FakeDb:
+    def __init__(self):
+        self.info = {}
+        self.get_calls = 0
+
+    async def get(self, _model, _ident):
+        self.get_calls += 1
+        return DailyIntake(
+            calories=500, sodium=800, purine=0, protein=20, carbs=60, fat=10, meal_count=2
+        )
+
+
+@pytest.fixture(autouse=True)
+def clear_summary_cache():
+    daily_summary._SUMMARY_CACHE.clear()
+    yield
+    daily_summary._SUMMARY_CACHE.clear()
+
+
+@pytest.mark.asyncio
+async def test_daily_summary_is_cached_until_invalidated():
+    db = FakeDb()
+    target = date(2026, 10, 1)
+
+    first = await daily_summary.load_daily_summary(db, 1, target)
+    second = await daily_summary.load_daily_summary(db, 1, target)
+    assert second is first
+    assert first.meal_count == 2
+    assert db.get_calls == 1
+
+    daily_summary.invalidate_daily_summary(db, 1, target)
+    await daily_summary.load_daily_summary(db, 1, target)
+    assert db.get_calls == 2
+
+    # 提交后再次失效，丢弃提交前并发写回的旧值
+    daily_summary._pop_pending_invalidations(db)
+    assert len(daily_summary._SUMMARY_CACHE) == 0
+    assert daily_summary._PENDING_KEY not in db.info
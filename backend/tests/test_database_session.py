@@ -0,0 +1,57 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+
+from app.api.deps import _owned_query
+from app.core.database import WriteTrackingSession
+from app.models.meal import FoodCategory, Meal, MealType
+from app.models.user import User
+
+
+def test_write_tracking_session_flags_only_writes():
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+
+    with WriteTrackingSession(engine) as session:
+        session.execute(select(User))
+        assert "has_writes" not in session.info
+
+        session.execute(update(User).values(nickname="x"))
+        assert session.info["has_writes"] is True
+
+        session.commit()
+        assert "has_writes" not in session.info
+
+        session.add(User(phone="13800138000", password_hash="x"))
+        session.flush()
+        assert session.info["has_writes"] is True
+
+
+def test_owned_query_raises_on_lazy_relationship_load():
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    Meal.__table__.create(engine)
+
+    with Session(engine) as session:
+        user = User(phone="13800138001", password_hash="x")
+        session.add(user)
+        session.flush()
+        user_id = user.id
+        session.add(Meal(
+            user_id=user_id,
+            client_id="c1",
+            name="米饭",
+            portion="1碗",
+            meal_type=MealType.LUNCH,
+            category=FoodCategory.STAPLE,
+            record_date=date(2026, 10, 1),
+        ))
+        session.commit()
+        session.expunge_all()
+
+        meal = session.execute(_owned_query(Meal), {"obj_id": 1, "user_id": user_id}).scalar_one()
+        with pytest.raises(InvalidRequestError):
+            meal.user